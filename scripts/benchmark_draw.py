@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Benchmark Stage 1 AllSprites.draw cost against the number of moving entities.
+
+Runs headless (SDL dummy video driver). For each entity count it builds a
+group with the map's static objects plus N wandering sprites. Depth sorting
+is timed on its own first: AllSprites.update_depth_order() (static sprites
+sorted once, moving ones re-sorted adaptively) against the old full sort of
+every layer with a lambda key. Then the whole draw() (sort, culling and the
+batched blit) is timed against the old draw loop.
+
+Usage: python scripts/benchmark_draw.py [--frames 300] [--counts 50 100 250 500 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+STAGE1_CODE = ROOT / 'stage 1' / 'code'
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, str(STAGE1_CODE))
+
+import pygame  # noqa: E402
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT  # noqa: E402
+from group import AllSprites  # noqa: E402
+
+MAP_SIZE = (3328, 3200)
+STATIC_OBJECTS = 150
+
+
+class Prop(pygame.sprite.Sprite):
+    static = True
+
+    def __init__(self, pos, surface, groups):
+        super().__init__(groups)
+        self.image = surface
+        self.rect = self.image.get_frect(topleft=pos)
+
+
+class Walker(Prop):
+    static = False
+    blinks = True
+
+    def __init__(self, pos, surface, groups):
+        super().__init__(pos, surface, groups)
+        self.direction = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1))
+
+    def update(self, dt):
+        self.rect.center += self.direction * 200 * dt
+
+
+def build_group(count, surface):
+    group = AllSprites()
+    for _ in range(STATIC_OBJECTS):
+        Prop((random.uniform(0, MAP_SIZE[0]), random.uniform(0, MAP_SIZE[1])), surface, group)
+    # Cluster entities around the camera like a horde chasing the player
+    for _ in range(count):
+        pos = (MAP_SIZE[0] / 2 + random.gauss(0, 900), MAP_SIZE[1] / 2 + random.gauss(0, 900))
+        Walker(pos, surface, group)
+    return group
+
+
+def legacy_draw(group, target_pos):
+    """The pre-existing draw loop: full lambda-key sort of every layer every frame."""
+    group.offset.x = -(target_pos[0] - WINDOW_WIDTH / 2)
+    group.offset.y = -(target_pos[1] - WINDOW_HEIGHT / 2)
+    for layer in group.layers.values():
+        for sprite in sorted(layer, key=lambda sprite: sprite.rect.centery):
+            group.display.blit(sprite.image, sprite.rect.topleft + group.offset)
+
+
+def legacy_sort(group):
+    """The pre-existing depth ordering alone: a full lambda-key sort of every layer."""
+    for layer in group.layers.values():
+        sorted(layer, key=lambda sprite: sprite.rect.centery)
+
+
+def time_sort(sort, group, frames, dt=1 / 60):
+    """Sorting only: the sprites move between calls, but their update is not timed."""
+    total = 0.0
+    for _ in range(frames):
+        group.update(dt)
+        start = time.perf_counter()
+        sort(group)
+        total += time.perf_counter() - start
+    return total / frames * 1000
+
+
+def time_draw(draw, group, frames, dt=1 / 60):
+    target = (MAP_SIZE[0] / 2, MAP_SIZE[1] / 2)
+    total = 0.0
+    for _ in range(frames):
+        group.update(dt)
+        start = time.perf_counter()
+        draw(target)
+        total += time.perf_counter() - start
+    return total / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--counts', type=int, nargs='+', default=[50, 100, 250, 500, 1000])
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    surface = pygame.Surface((48, 48), pygame.SRCALPHA)
+    surface.fill((200, 60, 60, 255))
+
+    print(f"{'entities':>9} {'legacy sort':>12} {'sort ms':>8} {'legacy draw':>12} {'draw ms':>8} "
+          f"{'drawn':>6} {'culled':>7}")
+    for count in args.counts:
+        random.seed(count)
+        legacy_group = build_group(count, surface)
+        legacy_sort_ms = time_sort(legacy_sort, legacy_group, args.frames)
+        legacy_ms = time_draw(lambda target: legacy_draw(legacy_group, target), legacy_group, args.frames)
+
+        random.seed(count)
+        group = build_group(count, surface)
+        sort_ms = time_sort(AllSprites.update_depth_order, group, args.frames)
+        draw_ms = time_draw(group.draw, group, args.frames)
+        print(f"{count:>9} {legacy_sort_ms:>12.3f} {sort_ms:>8.3f} {legacy_ms:>12.3f} {draw_ms:>8.3f} "
+              f"{group.drawn_count:>6} {group.culled_count:>7}")
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Benchmark Stage 1 enemy separation cost against the number of enemies.
+
+Runs headless (SDL dummy video driver). For each enemy count it scatters a
+horde around the map centre (denser as the count grows, like a crowd closing
+in on the player), then times one frame of separation steering three ways:
+the per-sprite Enemy.separation() over a rebuilt EntityGrid, the batched
+HordeEngine.separation() (needs NumPy), and a naive all-pairs pass for
+reference. The per-enemy columns stay flat for the grid versions while the
+all-pairs one grows with the horde.
+
+Usage: python scripts/benchmark_separation.py [--frames 30] [--counts 250 500 1000 2000 4000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+STAGE1_CODE = ROOT / 'stage 1' / 'code'
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, str(STAGE1_CODE))
+
+import pygame  # noqa: E402
+from settings import SEPARATION_RADIUS  # noqa: E402
+from sprites import Enemy  # noqa: E402
+from spatial import EntityGrid  # noqa: E402
+from horde import HordeEngine, HORDE_AVAILABLE  # noqa: E402
+
+MAP_SIZE = (3328, 3200)
+
+
+def build_horde(count, frames, grid):
+    enemies = []
+    for _ in range(count):
+        pos = (MAP_SIZE[0] / 2 + random.gauss(0, 500), MAP_SIZE[1] / 2 + random.gauss(0, 500))
+        enemies.append(Enemy(pos, frames, (), None, (), enemy_grid=grid))
+    return enemies
+
+
+def all_pairs(enemies):
+    """Reference O(n^2) separation: every enemy against every other."""
+    radius_sq = SEPARATION_RADIUS * SEPARATION_RADIUS
+    pushes = []
+    for enemy in enemies:
+        x, y = enemy.hitbox.center
+        push_x = push_y = 0.0
+        for other in enemies:
+            dx, dy = x - other.hitbox.centerx, y - other.hitbox.centery
+            dist_sq = dx * dx + dy * dy
+            if 0 < dist_sq < radius_sq:
+                dist = dist_sq ** 0.5
+                scale = (1 - dist / SEPARATION_RADIUS) / dist
+                push_x += dx * scale
+                push_y += dy * scale
+        pushes.append((push_x, push_y))
+    return pushes
+
+
+def time_frames(step, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        step()
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--counts', type=int, nargs='+', default=[250, 500, 1000, 2000, 4000])
+    parser.add_argument('--pairs-max', type=int, default=1000, help='largest count to run all-pairs on')
+    args = parser.parse_args()
+
+    pygame.init()
+    surface = pygame.Surface((80, 100), pygame.SRCALPHA)
+    surface.fill((200, 60, 60, 255))
+    frames = [surface]
+
+    print(f"{'enemies':>8} {'grid ms':>8} {'us/enemy':>9} {'horde ms':>9} {'us/enemy':>9} {'pairs ms':>9} {'us/enemy':>9}")
+    for count in args.counts:
+        random.seed(count)
+        grid = EntityGrid()
+        enemies = build_horde(count, frames, grid)
+
+        def grid_step():
+            grid.rebuild(enemies)
+            for enemy in enemies:
+                enemy.separation()
+        grid_ms = time_frames(grid_step, args.frames)
+        row = f"{count:>8} {grid_ms:>8.2f} {grid_ms * 1000 / count:>9.2f}"
+
+        if HORDE_AVAILABLE:
+            engine = HordeEngine([], MAP_SIZE)
+            for enemy in enemies:
+                engine.add(enemy)
+            horde_ms = time_frames(lambda: engine.separation(engine.centers()), args.frames)
+            row += f" {horde_ms:>9.2f} {horde_ms * 1000 / count:>9.2f}"
+        else:
+            row += f" {'-':>9} {'-':>9}"
+
+        if count <= args.pairs_max:
+            pairs_ms = time_frames(lambda: all_pairs(enemies), max(1, args.frames // 10))
+            row += f" {pairs_ms:>9.2f} {pairs_ms * 1000 / count:>9.2f}"
+        else:
+            row += f" {'-':>9} {'-':>9}"
+        print(row)
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+from settings import *
+
+class ScreenEffects:
+    """Full-screen tint, dim and flash passes drawn from a small pool of reusable surfaces.
+
+    Each pooled surface keeps its last fill colour, so a pass that repeats every
+    frame only changes the surface alpha and blits instead of allocating and
+    filling a new screen-sized surface.
+    """
+    def __init__(self, size = (WINDOW_WIDTH, WINDOW_HEIGHT), pool_size = 3):
+        self.size = size
+        self.pool_size = pool_size
+        self.pool = []  # [[colour, Surface]], most recently used last
+
+    def acquire(self, color):
+        """Return a pooled screen-sized surface filled with color."""
+        color = tuple(pygame.Color(color))
+        for entry in self.pool:
+            if entry[0] == color:
+                self.pool.remove(entry)
+                self.pool.append(entry)
+                return entry[1]
+
+        if len(self.pool) < self.pool_size:
+            entry = [color, pygame.Surface(self.size)]
+        else:
+            # Recycle the least recently used surface
+            entry = self.pool.pop(0)
+            entry[0] = color
+        entry[1].fill(color)
+        self.pool.append(entry)
+        return entry[1]
+
+    def tint(self, target, color, alpha):
+        """Blend a flat colour over the whole target."""
+        surface = self.acquire(color)
+        surface.set_alpha(alpha)
+        target.blit(surface, (0, 0))
+
+    def dim(self, target, alpha):
+        """Darken the whole target."""
+        self.tint(target, (0, 0, 0), alpha)
+
+    def flash(self, target, color, alpha, period = 200, duty = 100):
+        """Tint during the first `duty` ms of every `period` ms (blinking flash)."""
+        if pygame.time.get_ticks() % period < duty:
+            self.tint(target, color, alpha)
@@ -1,4 +1,19 @@
 from settings import *
+from operator import attrgetter
+
+# Depth key for Y-sorting (C-level getter instead of a Python lambda)
+depth_key = attrgetter('rect.centery')
+
+def needs_update(sprite):
+    """True for sprites with an update() of their own that aren't asleep (see support.set_awake)."""
+    return type(sprite).update is not pygame.sprite.Sprite.update and getattr(sprite, 'awake', True)
+
+def blit_batch(surface, batch):
+    """Submit a sequence of (surface, dest) pairs in one call (fblits on pygame-ce)."""
+    if hasattr(surface, 'fblits'):
+        surface.fblits(batch)
+    else:
+        surface.blits(batch, doreturn=False)
 
 class AllSprites(pygame.sprite.Group):
     def __init__(self):
@@ -6,11 +21,82 @@ class AllSprites(pygame.sprite.Group):
         self.display = pygame.display.get_surface()
         self.offset = pygame.Vector2(0,0)
         self.boundary_rect = None  # Set by game
+        self.tile_layers = []  # Baked static TileLayers, drawn below all sprites
+        
+        # Viewport culling: world-space camera rect and per-frame draw stats
+        self.camera_rect = pygame.FRect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.culled_count = 0
+        self.drawn_count = 0
+        
+        # Render layers, kept in sync as sprites join/leave the group.
+        # Dicts are used as insertion-ordered sets.
+        self.layers = {'ground': {}, 'objects': {}}
+        
+        # Depth order per layer, persisted across frames so it stays nearly sorted.
+        # Static sprites (see sprites.Sprite.static) are kept apart from the moving
+        # ones and only re-sorted when their membership changes.
+        self.static_order = {name: [] for name in self.layers}
+        self.moving_order = {name: [] for name in self.layers}
+        self.dirty_layers = set(self.layers)  # layers whose static order needs a sort
+        self.pending_removal = False
+        self.blink_sprites = {}  # Sprites hidden during the enemy blink phase
+        self.enemy_visible = True  # Set by game every frame
+        # Only these are ticked by update(): static sprites and sleepers are skipped
+        self.active = {}
 
-    def draw(self, target_pos):
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        # Layer is declared on the sprite class, so it is known before __init__ finishes
+        layer_name = getattr(sprite, 'render_layer', 'objects')
+        self.layers[layer_name][sprite] = None
+        if getattr(sprite, 'static', False):
+            self.static_order[layer_name].append(sprite)
+            self.dirty_layers.add(layer_name)
+        else:
+            self.moving_order[layer_name].append(sprite)
+        if getattr(sprite, 'blinks', False):
+            self.blink_sprites[sprite] = None
+        if needs_update(sprite):
+            self.active[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        for members in self.layers.values():
+            members.pop(sprite, None)
+        self.blink_sprites.pop(sprite, None)
+        self.active.pop(sprite, None)
+        # Dropped from the depth orders lazily, once per frame in update_depth_order
+        self.pending_removal = True
+
+    def reschedule(self, sprite):
+        """Called by set_awake when a member falls asleep or wakes up."""
+        if needs_update(sprite):
+            self.active[sprite] = None
+        else:
+            self.active.pop(sprite, None)
+
+    def update(self, *args, **kwargs):
+        """Tick the active sprites only; the copy lets updates add and kill sprites."""
+        for sprite in list(self.active):
+            sprite.update(*args, **kwargs)
+
+    def update_depth_order(self):
+        if self.pending_removal:
+            for name, members in self.layers.items():
+                if len(self.static_order[name]) + len(self.moving_order[name]) != len(members):
+                    # dict.fromkeys also drops duplicates left by a remove + re-add
+                    for orders in (self.static_order, self.moving_order):
+                        orders[name] = [sprite for sprite in dict.fromkeys(orders[name]) if sprite in members]
+            self.pending_removal = False
         
-        groundSprites = [sprite for sprite in self if hasattr(sprite, 'ground')]
-        objectSprites = [sprite for sprite in self if not hasattr(sprite, 'ground')]
+        for name in self.dirty_layers:
+            self.static_order[name].sort(key=depth_key)
+        self.dirty_layers.clear()
+        for order in self.moving_order.values():
+            # Timsort is adaptive: a list that was sorted last frame re-sorts in ~O(n)
+            order.sort(key=depth_key)
+
+    def draw(self, target_pos):
         self.offset.x = -(target_pos[0] - WINDOW_WIDTH / 2)
         self.offset.y = -(target_pos[1] - WINDOW_HEIGHT / 2)
         
@@ -35,13 +121,43 @@ class AllSprites(pygame.sprite.Group):
                 if cam_bottom > self.boundary_rect.bottom:
                     self.offset.y = -(self.boundary_rect.bottom - WINDOW_HEIGHT)
         
-        for layers in [groundSprites, objectSprites]:
-            for sprite in sorted(layers, key=lambda sprite: sprite.rect.centery):
-                # Check if this is an enemy and if enemies are currently invisible (blinking)
-                is_enemy = hasattr(sprite, 'death_time')
-                
-                # Skip drawing invisible enemies during blink phase
-                if is_enemy and hasattr(self, 'enemy_visible') and not self.enemy_visible:
+        # Only sprites overlapping the visible area are blitted
+        self.camera_rect.topleft = (-self.offset.x, -self.offset.y)
+        camera_rect = self.camera_rect
+        culled = 0
+        
+        for tile_layer in self.tile_layers:
+            tile_layer.draw(self.display, self.offset)
+        
+        # Skip drawing invisible enemies during blink phase
+        hidden = self.blink_sprites if not self.enemy_visible else ()
+        
+        self.update_depth_order()
+        
+        # Collect (image, dest) pairs and submit them in a single batched blit
+        offset_x, offset_y = self.offset
+        batch = []
+        for name in self.layers:
+            visible = [sprite for sprite in self.static_order[name] if camera_rect.colliderect(sprite.rect)]
+            culled += len(self.static_order[name]) - len(visible)
+            moving = []
+            for sprite in self.moving_order[name]:
+                if sprite in hidden:
                     continue
-                
-                self.display.blit(sprite.image, sprite.rect.topleft + self.offset)
\ No newline at end of file
+                if camera_rect.colliderect(sprite.rect):
+                    moving.append(sprite)
+                else:
+                    culled += 1
+            if visible and moving:
+                # Two sorted runs: Timsort merges them in one linear pass
+                visible += moving
+                visible.sort(key=depth_key)
+            elif moving:
+                visible = moving
+            batch += [(sprite.image, (sprite.rect.x + offset_x, sprite.rect.y + offset_y)) for sprite in visible]
+        
+        blit_batch(self.display, batch)
+        drawn = len(batch)
+        
+        self.culled_count = culled
+        self.drawn_count = drawn
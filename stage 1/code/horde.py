@@ -0,0 +1,420 @@
+from settings import *
+from support import frame_mask
+from lod import LOD_FULL, LOD_NEAR, LOD_FAR, lod_tiers
+import math
+
+try:
+    import numpy as np
+except ImportError:  # enemies keep their per-sprite Enemy.update
+    np = None
+
+HORDE_AVAILABLE = np is not None
+
+
+class HordeEngine:
+    """Batch movement and animation for stage 1 enemies (structure of arrays).
+
+    Each registered Enemy owns one slot in a set of NumPy arrays (hitbox
+    centre, direction, speed, animation phase, wander timer and the frozen /
+    stationary / dying flags). update() seeks or wanders the whole horde with
+    a few array operations and writes the results back to the sprites, which
+    are left as thin views that only hold rect, hitbox, image and mask.
+
+    Off-screen enemies get less: see level_of_detail() for the LOD tiers.
+    Walls are prefiltered in batch too: a summed-area table over a raster of
+    the collision rects tells which swept hitboxes touch a wall cell, and only
+    those enemies are resolved against the rects listed for those cells
+    (see collide_walls()).
+    """
+    fields = ('pos', 'half', 'direction', 'speed', 'phase', 'anim_speed', 'frame_count',
+              'frame_index', 'wander_timer', 'sight_memory', 'sight_timer', 'pace', 'tier', 'lod_dt',
+              'heading_timer', 'stationary', 'frozen', 'dying')
+
+    def __init__(self, wall_rects, world_size, flow_field = None, line_of_sight = None, wall_cell = 32,
+                 capacity = 256):
+        self.flow_field = flow_field  # FlowField toward the player, read in batch when chasing
+        self.line_of_sight = line_of_sight  # LineOfSight; without it every enemy always chases
+        self.sprites = []  # slot -> Enemy
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))           # hitbox centre
+        self.half = np.zeros((capacity, 2))          # hitbox half width / height
+        self.direction = np.zeros((capacity, 2))     # last unit move direction
+        self.speed = np.zeros(capacity)
+        self.phase = np.zeros(capacity)              # animation frame index (float)
+        self.anim_speed = np.zeros(capacity)
+        self.frame_count = np.ones(capacity, dtype = np.int64)
+        self.frame_index = np.zeros(capacity, dtype = np.int64)  # frame currently shown
+        self.wander_timer = np.zeros(capacity)
+        self.sight_memory = np.zeros(capacity)       # seconds of chasing left (see Enemy.aware)
+        self.sight_timer = np.zeros(capacity)        # seconds until an idle enemy looks again
+        self.pace = np.ones(capacity)                # speed factor of the last step (wandering is slower)
+        self.tier = np.zeros(capacity, dtype = np.int64)  # LOD tier from the last update
+        self.lod_dt = np.zeros(capacity)             # time banked by throttled near-ring enemies
+        self.heading_timer = np.zeros(capacity)      # seconds until a coasting far enemy re-reads its heading
+        self.stationary = np.zeros(capacity, dtype = bool)
+        self.frozen = np.zeros(capacity, dtype = bool)
+        self.dying = np.zeros(capacity, dtype = bool)
+        self.rng = np.random.default_rng()
+        # Blocked walk tiles as a flat bool array, for coasting far enemies
+        self.tile_blocked = None
+        if flow_field is not None:
+            self.tile_blocked = np.frombuffer(bytes(flow_field.grid.blocked), dtype = np.uint8) == 1
+
+        # Wall raster: a cell is blocked when any collision rect overlaps it
+        self.wall_cell = wall_cell
+        cols = math.ceil(world_size[0] / wall_cell)
+        rows = math.ceil(world_size[1] / wall_cell)
+        blocked = np.zeros((rows, cols), dtype = np.int32)
+        cell_walls = [[] for _ in range(rows * cols)]
+        for index, rect in enumerate(wall_rects):
+            x0, x1 = max(0, int(rect.left // wall_cell)), min(cols, math.ceil(rect.right / wall_cell))
+            y0, y1 = max(0, int(rect.top // wall_cell)), min(rows, math.ceil(rect.bottom / wall_cell))
+            blocked[y0:y1, x0:x1] = 1
+            for y in range(y0, y1):
+                for x in range(x0, x1):
+                    cell_walls[y * cols + x].append(index)
+        # Rects over each raster cell, flattened: cell c lists wall_index[wall_start[c]:wall_start[c + 1]]
+        self.wall_rects = np.array([(rect.left, rect.top, rect.right, rect.bottom) for rect in wall_rects],
+                                   dtype = np.float64).reshape(-1, 4)
+        self.wall_start = np.zeros(rows * cols + 1, dtype = np.int64)
+        self.wall_start[1:] = np.cumsum([len(walls) for walls in cell_walls])
+        self.wall_index = np.array([index for walls in cell_walls for index in walls], dtype = np.int64)
+        # wall_sum[y, x] = blocked cells above and left of (x, y); any box is four lookups
+        self.wall_sum = np.zeros((rows + 1, cols + 1), dtype = np.int32)
+        self.wall_sum[1:, 1:] = blocked.cumsum(0).cumsum(1)
+
+    def grow(self):
+        for name in self.fields:
+            array = getattr(self, name)
+            grown = np.zeros((len(array) * 2,) + array.shape[1:], dtype = array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def add(self, enemy):
+        """Give a spawned enemy a slot; reads its current hitbox, speed and frames."""
+        if self.count == len(self.pos):
+            self.grow()
+        i = self.count
+        self.sprites.append(enemy)
+        enemy.horde, enemy.horde_index = self, i
+        self.pos[i] = enemy.hitbox.center
+        self.half[i] = (enemy.hitbox.width / 2, enemy.hitbox.height / 2)
+        self.direction[i] = enemy.direction
+        self.speed[i] = enemy.speed
+        self.phase[i] = enemy.frame_index
+        self.anim_speed[i] = enemy.animation_speed
+        self.frame_count[i] = len(enemy.frames)
+        self.frame_index[i] = int(enemy.frame_index) % len(enemy.frames)
+        self.wander_timer[i] = enemy.wander_timer
+        self.sight_memory[i] = enemy.sight_memory
+        self.sight_timer[i] = enemy.sight_timer
+        self.pace[i] = enemy.pace
+        self.tier[i] = enemy.lod
+        self.lod_dt[i] = enemy.lod_dt
+        self.heading_timer[i] = enemy.heading_timer
+        self.stationary[i] = enemy.stationary
+        self.frozen[i] = enemy.frozen_by_light
+        self.dying[i] = enemy.death_time != 0
+        self.count += 1
+        enemy.schedule()  # the sprite only ticks again for its death timer
+
+    def remove(self, enemy):
+        """Free an enemy's slot by moving the last slot into it."""
+        i, last = enemy.horde_index, self.count - 1
+        if i != last:
+            for name in self.fields:
+                array = getattr(self, name)
+                array[i] = array[last]
+            moved = self.sprites[last]
+            self.sprites[i] = moved
+            moved.horde_index = i
+        self.sprites.pop()
+        self.count -= 1
+        enemy.horde, enemy.horde_index = None, None
+
+    def mark_dying(self, enemy):
+        self.dying[enemy.horde_index] = True
+
+    def set_speed(self, speed):
+        """Difficulty change: new speed for every living enemy."""
+        n = self.count
+        self.speed[:n][~self.dying[:n]] = speed
+
+    def centers(self):
+        """(count, 2) view of the hitbox centres, in slot order (matches self.sprites)."""
+        return self.pos[:self.count]
+
+    def path_directions(self, pos, target):
+        """Batch Enemy.path_direction() for an (m, 2) array; zero rows where pos is on the target."""
+        delta = np.asarray(target, dtype = np.float64) - pos
+        dist = np.hypot(delta[:, 0], delta[:, 1])
+        ways = np.zeros_like(pos)
+        seek = dist > 0
+        ways[seek] = delta[seek] / dist[seek, None]
+        if self.flow_field is not None and self.flow_field.arrays is not None:
+            # Path around walls wherever the field has a step; direct seek near the player
+            flow, has_flow = self.flow_field.directions(pos)
+            ways[has_flow] = flow[has_flow]
+        return ways
+
+    def separation(self, pos, cell_size = 128):
+        """Batch Enemy.separation(): (n, 2) pushes from grid-bucket neighbours.
+
+        Enemies are sorted by grid cell, so bucket mates sit next to each other
+        and each enemy is compared with the next SEPARATION_NEIGHBOURS in that
+        order (one array pass per offset). Pairs split by a cell border are
+        caught by a second pass: each enemy also reads a few enemies from the
+        three cells on its near side, found by binary search in the sorted
+        cell keys. While SEPARATION_RADIUS is under half a cell, those are the
+        only other cells its radius can reach. The work is n * neighbours,
+        never all pairs.
+        """
+        n = len(pos)
+        push = np.zeros((n, 2))
+        cells = (pos // cell_size).astype(np.int64)
+        stride = 1_000_003
+        key = cells[:, 1] * stride + cells[:, 0]  # one int per cell
+        order = np.argsort(key, kind = 'stable')
+        sorted_key, sorted_pos = key[order], pos[order]
+        radius = SEPARATION_RADIUS
+        for k in range(1, min(SEPARATION_NEIGHBOURS, n - 1) + 1):
+            same = sorted_key[k:] == sorted_key[:-k]
+            if not same.any():
+                break  # no bucket has more than k enemies
+            diff = sorted_pos[:-k] - sorted_pos[k:]
+            dist = np.hypot(diff[:, 0], diff[:, 1])
+            near = same & (dist > 0) & (dist < radius)
+            scale = np.zeros(len(dist))
+            scale[near] = (1 - dist[near] / radius) / dist[near]
+            force = diff * scale[:, None]
+            force[same & (dist == 0), 0] = 1  # stacked exactly: split the pair apart along x
+            push[order[:-k]] += force
+            push[order[k:]] -= force
+
+        # Across borders: the side, corner and other side cell nearest each enemy.
+        # Both enemies of a close pair sit near the same border, so each reads the other.
+        side = np.where(pos - cells * cell_size < cell_size / 2, -1, 1)
+        rank = np.empty(n, dtype = np.int64)
+        rank[order] = np.arange(n)  # varies where each enemy starts reading a crowded cell
+        reads = max(1, SEPARATION_NEIGHBOURS // 2)
+        for dx, dy in ((1, 0), (0, 1), (1, 1)):
+            probe = key + side[:, 1] * (dy * stride) + side[:, 0] * dx
+            start = np.searchsorted(sorted_key, probe, 'left')
+            count = np.searchsorted(sorted_key, probe, 'right') - start
+            for j in range(reads):
+                take = np.flatnonzero(count > j)
+                if not len(take):
+                    break
+                other = sorted_pos[start[take] + (rank[take] + j) % count[take]]
+                diff = pos[take] - other
+                dist = np.hypot(diff[:, 0], diff[:, 1])
+                near = dist < radius  # other cells: never stacked exactly
+                scale = (1 - dist[near] / radius) / dist[near]
+                push[take[near]] += diff[near] * scale[:, None]
+        return push
+
+    def awareness(self, dt, target, moving):
+        """Batch Enemy.aware(): mask of the moving enemies that chase target this frame.
+
+        dt is an array here: each enemy's own step time (see the LOD tiers).
+        """
+        n = self.count
+        memory, timer = self.sight_memory[:n], self.sight_timer[:n]
+        idle = moving & (memory <= 0)
+        timer[idle] -= dt[idle]
+        look = moving & ~(idle & (timer > 0))
+        timer[idle & look] = SIGHT_RECHECK
+        looking = np.flatnonzero(look)
+        if len(looking):
+            seen = self.line_of_sight.visible(self.pos[looking], target)
+            memory[looking[seen]] = SIGHT_MEMORY
+            lost = looking[~seen]
+            memory[lost] = np.maximum(memory[lost] - dt[lost], 0)
+        return moving & (memory > 0)
+
+    def collide_walls(self, index, step, cells):
+        """Batch Enemy.collision(): step the enemies in index one axis at a time, stopping at walls.
+
+        cells holds the raster cell range (x0, y0, x1, y1) under each swept
+        hitbox; the rects listed for those cells are the only candidates. A
+        hitbox overlapping several rects stops at the nearest edge, which is
+        where Enemy.collision() ends up after visiting them one by one.
+        """
+        m = len(index)
+        x0, y0, x1, y1 = cells
+        span_x, span_y = x1 - x0, y1 - y0
+        # Every (enemy, cell) pair of the ranges, then every (enemy, rect) pair of those cells
+        off_x, off_y = np.arange(span_x.max()), np.arange(span_y.max())
+        inside = (off_x[None, None, :] < span_x[:, None, None]) & (off_y[None, :, None] < span_y[:, None, None])
+        cols = self.wall_sum.shape[1] - 1
+        cell = ((y0[:, None, None] + off_y[None, :, None]) * cols + x0[:, None, None] + off_x[None, None, :])[inside]
+        owner = np.broadcast_to(np.arange(m)[:, None, None], inside.shape)[inside]
+        first = self.wall_start[cell]
+        count = self.wall_start[cell + 1] - first
+        owner = np.repeat(owner, count)
+        slot = np.arange(len(owner)) + np.repeat(first - (np.cumsum(count) - count), count)
+        walls = self.wall_rects[self.wall_index[slot]]
+
+        centre = self.pos[index]
+        half = self.half[index]
+        heading = self.direction[index]
+        pair_half = half[owner]
+        for axis in (0, 1):
+            centre[:, axis] += step[:, axis]
+            pair_centre = centre[owner]
+            hit = ((pair_centre[:, 0] - pair_half[:, 0] < walls[:, 2]) & (pair_centre[:, 0] + pair_half[:, 0] > walls[:, 0]) &
+                   (pair_centre[:, 1] - pair_half[:, 1] < walls[:, 3]) & (pair_centre[:, 1] + pair_half[:, 1] > walls[:, 1]))
+            sign = heading[owner, axis]
+            # Moving forward: back off to the nearest near edge; moving back: to the nearest far edge
+            ahead = hit & (sign > 0)
+            stop = np.full(m, np.inf)
+            np.minimum.at(stop, owner[ahead], walls[ahead, axis])
+            blocked = stop < np.inf
+            centre[blocked, axis] = stop[blocked] - half[blocked, axis]
+            behind = hit & (sign < 0)
+            stop = np.full(m, -np.inf)
+            np.maximum.at(stop, owner[behind], walls[behind, axis + 2])
+            blocked = stop > -np.inf
+            centre[blocked, axis] = stop[blocked] + half[blocked, axis]
+        self.pos[index] = centre
+
+    def level_of_detail(self, dt, view):
+        """Per-enemy step time for this frame and the tier masks (full, far) for a camera rect.
+
+        On-screen enemies step every frame; the near ring banks its time and
+        steps every LOD_NEAR_INTERVAL; far enemies step 0 and only coast.
+        Sprites whose tier changed get their lod attribute updated.
+        """
+        n = self.count
+        tier = lod_tiers(self.pos[:n], view)
+        banked = self.lod_dt[:n]
+        banked += dt
+        full = tier == LOD_FULL
+        far = tier == LOD_FAR
+        due = full | ((tier == LOD_NEAR) & (banked >= LOD_NEAR_INTERVAL))
+        step_dt = np.where(due, banked, 0.0)
+        banked[due | far] = 0
+        changed = np.flatnonzero(tier != self.tier[:n])
+        for i, value in zip(changed.tolist(), tier[changed].tolist()):
+            self.sprites[i].lod = value
+        self.tier[:n] = tier
+        return step_dt, full, far
+
+    def update(self, dt, target, chase = True, view = None):
+        """Move and animate every enemy; chase target, or wander when chase is False.
+
+        With a camera view the LOD tiers apply; without one every enemy gets
+        the full update.
+        """
+        n = self.count
+        if n == 0:
+            return
+        pos, direction, speed, pace = self.pos[:n], self.direction[:n], self.speed[:n], self.pace[:n]
+        start = pos.copy()
+        dying = self.dying[:n]
+        moving = ~(self.stationary[:n] | self.frozen[:n] | dying)
+        if view is not None:
+            step_dt, full, far = self.level_of_detail(dt, view)
+        else:
+            step_dt, full, far = np.full(n, dt), np.ones(n, dtype = bool), np.zeros(n, dtype = bool)
+        thinking = moving & (step_dt > 0)
+
+        if not chase:
+            hunting = np.zeros(n, dtype = bool)
+        elif self.line_of_sight is not None:
+            hunting = self.awareness(step_dt, target, thinking)
+        else:
+            hunting = thinking
+        wandering = thinking & ~hunting
+
+        if hunting.any():
+            hunt = np.flatnonzero(hunting)
+            ways = self.path_directions(pos[hunt], target)
+            heading = ways.any(axis = 1)
+            direction[hunt[heading]] = ways[heading]
+            # Spread out instead of stacking on the same pixels
+            steer = direction + self.separation(pos) * SEPARATION_WEIGHT
+            length = np.hypot(steer[:, 0], steer[:, 1])
+            spread = hunting & (length > 0)
+            direction[spread] = steer[spread] / length[spread, None]
+        if wandering.any():
+            # Invisible or out of sight player: wander, picking a new heading every 2 seconds
+            timer = self.wander_timer[:n]
+            timer[wandering] += step_dt[wandering]
+            redo = np.flatnonzero(wandering & (timer > 2))
+            if len(redo):
+                heading = self.rng.uniform(-1, 1, (len(redo), 2))
+                length = np.hypot(heading[:, 0], heading[:, 1])
+                heading[length > 0] /= length[length > 0, None]
+                direction[redo] = heading
+                timer[redo] = 0
+        pace[thinking] = np.where(hunting, 1.0, 0.3)[thinking]  # slower wandering
+        step = direction * (speed * step_dt * pace)[:, None]
+        step[~thinking] = 0
+
+        # Swept hitbox of each move against the wall raster
+        new_pos = pos + step
+        half = self.half[:n]
+        cell = self.wall_cell
+        rows, cols = self.wall_sum.shape[0] - 1, self.wall_sum.shape[1] - 1
+        low = (np.minimum(pos, new_pos) - half) // cell
+        high = (np.maximum(pos, new_pos) + half) // cell + 1
+        x0 = np.clip(low[:, 0], 0, cols).astype(np.int64)
+        y0 = np.clip(low[:, 1], 0, rows).astype(np.int64)
+        x1 = np.clip(high[:, 0], 0, cols).astype(np.int64)
+        y1 = np.clip(high[:, 1], 0, rows).astype(np.int64)
+        s = self.wall_sum
+        near_wall = (s[y1, x1] - s[y0, x1] - s[y1, x0] + s[y0, x0]) > 0
+
+        free = thinking & ~near_wall
+        pos[free] = new_pos[free]
+        blocked = np.flatnonzero(thinking & near_wall)
+        if len(blocked):
+            self.collide_walls(blocked, step[blocked], (x0[blocked], y0[blocked], x1[blocked], y1[blocked]))
+
+        # Far away: dead-reckon along a flow-field heading re-read every LOD_FAR_INTERVAL,
+        # holding still before blocked tiles (and re-reading the heading next frame)
+        coasting = moving & far
+        if coasting.any():
+            heading_timer = self.heading_timer[:n]
+            heading_timer[coasting] -= dt
+            if chase:
+                steer = np.flatnonzero(coasting & (heading_timer <= 0))
+                if len(steer):
+                    heading_timer[steer] = LOD_FAR_INTERVAL
+                    ways = self.path_directions(pos[steer], target)
+                    heading = ways.any(axis = 1)
+                    direction[steer[heading]] = ways[heading]
+                    pace[steer] = 1
+            glide = np.flatnonzero(coasting)
+            ahead = pos[glide] + direction[glide] * (speed[glide] * pace[glide] * dt)[:, None]
+            if self.tile_blocked is not None:
+                grid = self.flow_field.grid
+                tile_x = (ahead[:, 0] // grid.tile_size).astype(np.int64)
+                tile_y = (ahead[:, 1] // grid.tile_size).astype(np.int64)
+                inside = (tile_x >= 0) & (tile_x < grid.width) & (tile_y >= 0) & (tile_y < grid.height)
+                index = np.where(inside, tile_y * grid.width + tile_x, 0)
+                open_ahead = inside & ~self.tile_blocked[index]
+                heading_timer[glide[~open_ahead]] = 0
+                glide, ahead = glide[open_ahead], ahead[open_ahead]
+            pos[glide] = ahead
+
+        # Write back only the enemies that actually moved (the rest are held by walls or blocked tiles)
+        sprites = self.sprites
+        moved = np.flatnonzero((pos != start).any(axis = 1))
+        for i, center in zip(moved.tolist(), pos[moved].tolist()):
+            enemy = sprites[i]
+            enemy.hitbox.center = center
+            enemy.rect.center = center
+
+        # Animation, on screen only: just the sprites whose frame changed get a new image
+        animated = full & ~dying
+        phase = self.phase[:n]
+        phase[animated] += self.anim_speed[:n][animated] * dt
+        frame = phase.astype(np.int64) % self.frame_count[:n]
+        changed = np.flatnonzero((frame != self.frame_index[:n]) & animated)
+        self.frame_index[:n][changed] = frame[changed]
+        for i, index in zip(changed.tolist(), frame[changed].tolist()):
+            enemy = sprites[i]
+            enemy.image = enemy.frames[index]
+            enemy.mask = frame_mask(enemy.image)
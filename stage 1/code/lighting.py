@@ -0,0 +1,244 @@
+from settings import *
+from collections import OrderedDict
+import math
+
+try:
+    import numpy as np
+except ImportError:  # Dynamic lights are skipped; the flashlight cone still works
+    np = None
+
+DYNAMIC_LIGHTS_AVAILABLE = np is not None
+
+
+class FlashlightCone:
+    """Pre-rendered flashlight beam with rotated variants cached per quantized angle.
+
+    The beam gradient, warm tint and player glow are baked once, pointing right,
+    at 1/scale resolution, and drawn into a Lightmap buffer of the same scale.
+    Compositing is done in premultiplied alpha so the result matches drawing
+    darkness, tint and glow as separate full-screen layers.
+    """
+    def __init__(self, length, angle_deg, night_alpha, start_offset,
+                 scale = 4, angle_step = 2, cache_size = 24):
+        self.length = length
+        self.half_angle = math.radians(angle_deg / 2)
+        self.night_alpha = night_alpha
+        self.start_offset = start_offset
+        self.scale = scale
+        self.angle_step = angle_step
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # {angle_key: (light, light_anchor, tint, tint_anchor)}
+        self.scratch = None  # buffer-sized surface for masked (occluded) draws
+
+        self.bake()
+
+    def ring_points(self, inner_r, outer_r, angle_scale, origin, steps = 28):
+        """Points of an annular sector pointing along +x from origin (texture pixels)."""
+        start = -self.half_angle * angle_scale
+        end = self.half_angle * angle_scale
+        arc = [start + (end - start) * (i / steps) for i in range(steps + 1)]
+        pts = [(origin[0] + math.cos(t) * outer_r, origin[1] + math.sin(t) * outer_r) for t in arc]
+        pts += [(origin[0] + math.cos(t) * inner_r, origin[1] + math.sin(t) * inner_r) for t in reversed(arc)]
+        return pts
+
+    def bake(self):
+        s = self.scale
+        so = self.start_offset / s
+        L = self.length / s
+        clamp = lambda v: max(0, min(255, int(v)))
+        # Same falloff as the original polygon beam: (inner, outer, darkness alpha, angle_scale)
+        layers = [
+            (so, L * 0.95, clamp(self.night_alpha - 60), 1.00),
+            (so, L * 0.85, clamp(self.night_alpha - 110), 0.98),
+            (so, L * 0.72, clamp(self.night_alpha - 150), 0.95),
+            (so, L * 0.58, clamp(self.night_alpha - 180), 0.92),
+            (so, L * 0.45, 40, 0.90),
+            (so, L * 0.33, 15, 0.88),
+            (so, L * 0.22, 0, 0.85),  # inner core fully clear, begins at the offset
+        ]
+
+        # Light texture stores how much darkness to remove (subtracted from the night fill)
+        half_height = math.ceil(L * 0.95 * math.sin(self.half_angle)) + 1
+        self.light = pygame.Surface((math.ceil(L * 0.95) + 2, half_height * 2), pygame.SRCALPHA)
+        origin = (0, half_height)
+        for inner_r, outer_r, alpha, a_scale in layers:
+            light_alpha = clamp(self.night_alpha - alpha)
+            pygame.draw.polygon(self.light, (0, 0, 0, light_alpha), self.ring_points(inner_r, outer_r, a_scale, origin))
+
+        # Warm light tint inside cone for a more realistic torch hue
+        half_height = math.ceil(L * 0.5 * math.sin(self.half_angle * 0.92)) + 1
+        self.tint = pygame.Surface((math.ceil(L * 0.5) + 2, half_height * 2), pygame.SRCALPHA)
+        pygame.draw.polygon(self.tint, (255, 240, 180, 28), self.ring_points(so, L * 0.5, 0.92, (0, half_height)))
+        self.tint = self.tint.premul_alpha()
+
+        # Small glow around player for ambient spill
+        radius = max(1, round(70 / s))
+        self.glow = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(self.glow, (255, 240, 200, 36), (radius, radius), radius)
+        self.glow = self.glow.premul_alpha()
+
+    def rotated(self, surface, angle):
+        """Rotate a beam texture and return it with the offset from its emitter to its topleft."""
+        image = pygame.transform.rotate(surface, -angle)
+        # The emitter sits at the middle of the texture's left edge
+        rad = math.radians(angle)
+        half_w = surface.get_width() / 2
+        anchor = (-image.get_width() / 2 + half_w * math.cos(rad),
+                  -image.get_height() / 2 + half_w * math.sin(rad))
+        return image, anchor
+
+    def get_variant(self, direction):
+        angle = math.degrees(math.atan2(direction.y, direction.x))
+        key = round(angle / self.angle_step) % round(360 / self.angle_step)
+        variant = self.cache.get(key)
+        if variant is None:
+            light, light_anchor = self.rotated(self.light, key * self.angle_step)
+            tint, tint_anchor = self.rotated(self.tint, key * self.angle_step)
+            variant = (light, light_anchor, tint, tint_anchor)
+            self.cache[key] = variant
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return variant
+
+    def masked(self, buffer, image, pos, mask):
+        """Copy image into a scratch buffer and clear it outside the mask (occlusion)."""
+        if self.scratch is None or self.scratch.get_size() != buffer.get_size():
+            self.scratch = pygame.Surface(buffer.get_size(), pygame.SRCALPHA)
+        self.scratch.fill((0, 0, 0, 0))
+        self.scratch.blit(image, pos, special_flags=pygame.BLEND_RGBA_ADD)
+        self.scratch.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        return self.scratch
+
+    def draw_beam(self, buffer, origin, direction, mask = None):
+        """Cut the beam out of the darkness in a lightmap buffer (origin in screen coords).
+
+        An optional mask (white where light reaches, see Lightmap.polygon_mask)
+        keeps the beam out of shadowed areas.
+        """
+        s = self.scale
+        light, light_anchor, _, _ = self.get_variant(direction)
+        emitter = origin + direction * self.start_offset
+        pos = (emitter.x / s + light_anchor[0], emitter.y / s + light_anchor[1])
+        if mask is not None:
+            light, pos = self.masked(buffer, light, pos, mask), (0, 0)
+        buffer.blit(light, pos, special_flags=pygame.BLEND_RGBA_SUB)
+
+    def draw_tint(self, buffer, origin, direction, mask = None):
+        """Add the warm beam tint and player glow on top of the darkness."""
+        s = self.scale
+        _, _, tint, tint_anchor = self.get_variant(direction)
+        emitter = origin + direction * self.start_offset
+        pos = (emitter.x / s + tint_anchor[0], emitter.y / s + tint_anchor[1])
+        if mask is not None:
+            tint, pos = self.masked(buffer, tint, pos, mask), (0, 0)
+        buffer.blit(tint, pos, special_flags=pygame.BLEND_PREMULTIPLIED)
+        glow_center = origin + direction * (self.start_offset * 0.4)
+        buffer.blit(self.glow, self.glow.get_rect(center = (glow_center.x / s, glow_center.y / s)),
+                    special_flags=pygame.BLEND_PREMULTIPLIED)
+
+
+class Lightmap:
+    """Low-resolution darkness buffer that accumulates any number of dynamic lights.
+
+    Point and cone lights are evaluated with NumPy over only the buffer cells
+    inside each light's bounding box, so a light costs a few array operations.
+    The finished buffer is upscaled with smoothscale and composited once.
+    Typical frame: begin(), polygon_mask(), FlashlightCone.draw_beam(), add_point()/add_cone(),
+    apply_lights(), FlashlightCone.draw_tint(), present().
+    """
+    def __init__(self, night_alpha, size = (WINDOW_WIDTH, WINDOW_HEIGHT), scale = 4, mask_samples = 2):
+        self.night_alpha = night_alpha
+        self.scale = scale
+        self.buffer = pygame.Surface((size[0] // scale, size[1] // scale), pygame.SRCALPHA)
+        self.overlay = pygame.Surface(size, pygame.SRCALPHA)
+        self.mask = pygame.Surface(self.buffer.get_size(), pygame.SRCALPHA)
+        # Shadow polygons are drawn mask_samples times finer and averaged down, so the beam edge is anti-aliased
+        self.mask_samples = mask_samples
+        width, height = self.buffer.get_size()
+        self.fine_mask = pygame.Surface((width * mask_samples, height * mask_samples), pygame.SRCALPHA)
+        self.lights = []  # [(x, y, radius, intensity, direction, cos_half)] queued for this frame
+        self.light_count = 0
+
+        if np is not None:
+            width, height = self.buffer.get_size()
+            # Screen-space centres of the buffer cells, broadcastable to (width, height)
+            self.xs = ((np.arange(width, dtype=np.float32) + 0.5) * scale)[:, None]
+            self.ys = ((np.arange(height, dtype=np.float32) + 0.5) * scale)[None, :]
+            self.light = np.zeros((width, height), dtype=np.float32)
+
+    def begin(self):
+        """Reset the buffer to full darkness and clear queued lights."""
+        self.buffer.fill((0, 0, 0, self.night_alpha))
+        self.lights.clear()
+
+    def polygon_mask(self, outline):
+        """Mask that is white inside a polygon (buffer coords), clear elsewhere and graded along the edge."""
+        if len(outline) < 3:
+            self.mask.fill((0, 0, 0, 0))
+            return self.mask
+        samples = self.mask_samples
+        self.fine_mask.fill((0, 0, 0, 0))
+        pygame.draw.polygon(self.fine_mask, (255, 255, 255, 255), [(x * samples, y * samples) for x, y in outline])
+        pygame.transform.smoothscale(self.fine_mask, self.mask.get_size(), self.mask)
+        return self.mask
+
+    def add_point(self, pos, radius, intensity = 1.0):
+        """Queue a round light at a screen position."""
+        self.lights.append((pos[0], pos[1], radius, intensity, None, 0.0))
+
+    def add_cone(self, pos, direction, radius, angle_deg, intensity = 1.0):
+        """Queue a cone light at a screen position pointing along direction."""
+        if direction.length_squared() == 0:
+            return
+        direction = direction.normalize()
+        self.lights.append((pos[0], pos[1], radius, intensity, (direction.x, direction.y),
+                            math.cos(math.radians(angle_deg / 2))))
+
+    def light_window(self, x, y, radius):
+        """Buffer index ranges covered by a light, or None when it is fully off screen."""
+        width, height = self.light.shape
+        x0 = max(0, int((x - radius) // self.scale))
+        x1 = min(width, int((x + radius) // self.scale) + 1)
+        y0 = max(0, int((y - radius) // self.scale))
+        y1 = min(height, int((y + radius) // self.scale) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, x1, y0, y1
+
+    def apply_lights(self):
+        """Remove darkness under every queued light (multiplicative, clamped at fully lit)."""
+        self.light_count = 0
+        if np is None or not self.lights:
+            return
+
+        light = self.light
+        light.fill(0)
+        for x, y, radius, intensity, direction, cos_half in self.lights:
+            window = self.light_window(x, y, radius)
+            if window is None:
+                continue
+            x0, x1, y0, y1 = window
+            dx = self.xs[x0:x1] - x
+            dy = self.ys[:, y0:y1] - y
+            dist_sq = dx * dx + dy * dy
+            # Smooth quadratic falloff to zero at the radius
+            falloff = np.clip(1.0 - dist_sq / (radius * radius), 0.0, 1.0)
+            falloff *= falloff
+            if direction is not None:
+                cos_angle = (dx * direction[0] + dy * direction[1]) / np.sqrt(dist_sq + 1e-6)
+                # Soft edge over the outer quarter of the cone
+                falloff *= np.clip((cos_angle - cos_half) / ((1.0 - cos_half) * 0.25), 0.0, 1.0)
+            light[x0:x1, y0:y1] += falloff * intensity
+            self.light_count += 1
+
+        alpha = pygame.surfarray.pixels_alpha(self.buffer)
+        np.minimum(light, 1.0, out=light)
+        np.multiply(alpha, 1.0 - light, out=alpha, casting='unsafe')
+        del alpha  # Release the surface lock
+
+    def present(self, surface):
+        """Upscale the buffer and composite it over the surface."""
+        pygame.transform.smoothscale(self.buffer, self.overlay.get_size(), self.overlay)
+        surface.blit(self.overlay, (0, 0), special_flags=pygame.BLEND_PREMULTIPLIED)
@@ -0,0 +1,65 @@
+from settings import *
+
+try:
+    import numpy as np
+except ImportError:  # tiers are computed per enemy with lod_tier()
+    np = None
+
+# Update tiers, by distance from the camera rect
+LOD_FULL = 0   # on screen: animate, think and collide every frame
+LOD_NEAR = 1   # within LOD_NEAR_RING of the screen: move every LOD_NEAR_INTERVAL with the banked dt, no animation
+LOD_FAR = 2    # beyond: coast along a flow-field heading re-read every LOD_FAR_INTERVAL, no AI or collision
+LOD_COLORS = {LOD_FULL: (0, 255, 0), LOD_NEAR: (255, 220, 0), LOD_FAR: (255, 60, 60)}
+LOD_SCREEN_MARGIN = 64  # a sprite centred this far off screen can still show an edge
+
+
+def lod_tier(pos, view):
+    """Tier of a world position for a camera rect (world space)."""
+    x, y = pos
+    dx = max(view.left - x, 0, x - view.right)
+    dy = max(view.top - y, 0, y - view.bottom)
+    gap = max(dx, dy)
+    if gap <= LOD_SCREEN_MARGIN:
+        return LOD_FULL
+    return LOD_NEAR if gap <= LOD_NEAR_RING else LOD_FAR
+
+
+def lod_tiers(positions, view):
+    """Vectorized lod_tier() for an (n, 2) array; returns an int array."""
+    xs, ys = positions[:, 0], positions[:, 1]
+    dx = np.maximum(np.maximum(view.left - xs, xs - view.right), 0)
+    dy = np.maximum(np.maximum(view.top - ys, ys - view.bottom), 0)
+    gap = np.maximum(dx, dy)
+    return np.where(gap <= LOD_SCREEN_MARGIN, LOD_FULL, np.where(gap <= LOD_NEAR_RING, LOD_NEAR, LOD_FAR))
+
+
+def draw_lod_radar(surface, area, view, enemies, font):
+    """Debug radar: the screen, the near ring and every enemy coloured by its tier.
+
+    area is the screen rect to draw into; it shows the camera view grown by
+    twice the near ring, and enemies outside that are pinned to the border.
+    """
+    world = view.inflate(LOD_NEAR_RING * 4, LOD_NEAR_RING * 4)
+    scale = min(area.width / world.width, area.height / world.height)
+
+    def to_radar(x, y):
+        x = min(max(x, world.left), world.right)
+        y = min(max(y, world.top), world.bottom)
+        return area.left + (x - world.left) * scale, area.top + (y - world.top) * scale
+
+    def radar_rect(rect):
+        left, top = to_radar(rect.left, rect.top)
+        right, bottom = to_radar(rect.right, rect.bottom)
+        return pygame.FRect(left, top, right - left, bottom - top)
+
+    panel = pygame.Surface(area.size, pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 170))
+    surface.blit(panel, area.topleft)
+    pygame.draw.rect(surface, LOD_COLORS[LOD_NEAR], radar_rect(view.inflate(LOD_NEAR_RING * 2, LOD_NEAR_RING * 2)), 1)
+    pygame.draw.rect(surface, LOD_COLORS[LOD_FULL], radar_rect(view.inflate(LOD_SCREEN_MARGIN * 2, LOD_SCREEN_MARGIN * 2)), 1)
+    counts = {LOD_FULL: 0, LOD_NEAR: 0, LOD_FAR: 0}
+    for (x, y), tier in enemies:
+        counts[tier] += 1
+        pygame.draw.circle(surface, LOD_COLORS[tier], to_radar(x, y), 2)
+    label = font.render(f"LOD {counts[LOD_FULL]}/{counts[LOD_NEAR]}/{counts[LOD_FAR]}", True, (255, 0, 255))
+    surface.blit(label, (area.right - label.get_width(), area.top - label.get_height() - 4))
@@ -3,6 +3,16 @@ from player import Player
 from sprites import *
 from pytmx.util_pygame import load_pygame
 from group import AllSprites
+from tilelayer import TileLayer
+from lighting import FlashlightCone, Lightmap, DYNAMIC_LIGHTS_AVAILABLE
+from spatial import StaticSpatialHash, EntityGrid, SpawnPoints, merge_rects
+from visibility import cast_cone, occluder_rect
+from effects import ScreenEffects
+from support import collide_rect_mask
+from pools import SpritePool, ProjectilePool
+from horde import HordeEngine, HORDE_AVAILABLE
+from navigation import TileGrid, FlowField, LineOfSight
+from lod import lod_tier, draw_lod_radar
 from random import randint, choice
 from undertale_mechanics import *
 from npc_system import *
@@ -12,6 +22,11 @@ import sys
 import os
 import math
 
+try:
+    import numpy as np
+except ImportError:  # Flashlight test runs per enemy in plain Python
+    np = None
+
 class Game:
     def __init__(self):
         pygame.init()
@@ -50,6 +65,9 @@ class Game:
         self.player_max_hp = 50
         
         self.npc_sprites = pygame.sprite.Group()
+        # Broad-phase grids: enemies are re-bucketed every frame, interactables at setup
+        self.enemy_grid = EntityGrid()
+        self.interactable_grid = EntityGrid()
         self.npc_dialogue = NPCDialogue(self)
         self.intro_complete = False
         
@@ -143,18 +161,37 @@ class Game:
             self.title_font = pygame.font.Font(None, 48)
             print("Using default fonts as fallback")
         self.game_over = False
+        self.show_collision_debug = False  # F3 outlines the merged collision rects
         self.freeze_timer = Timer(1000)  # 1 second freeze timer
         self.pending_game_over = False  # Track if game over should happen after freeze
         
         # Flashlight / visibility settings
         self.flashlight_enabled = True
         # Extend beam across the whole screen (diagonal)
-        import math
         self.flashlight_length = int(math.hypot(WINDOW_WIDTH, WINDOW_HEIGHT))
         self.flashlight_angle_deg = 60  # full cone angle
         self.night_alpha = 200  # 0-255 darkness outside cone
         # Start the beam a bit in front of the player to avoid a pointy apex at the origin
         self.flashlight_start_offset = 36  # px ahead of player along aim direction
+        # Precomputed thresholds for the batched cone test (no sqrt / acos per enemy)
+        self.flashlight_length_sq = self.flashlight_length ** 2
+        self.flashlight_start_sq = self.flashlight_start_offset ** 2
+        self.flashlight_cos_half = math.cos(math.radians(self.flashlight_angle_deg / 2))
+        # Beam gradient baked once; rotated variants cached every 2 degrees
+        self.flashlight_cone = FlashlightCone(self.flashlight_length, self.flashlight_angle_deg,
+                                              self.night_alpha, self.flashlight_start_offset)
+        # Quarter-resolution darkness buffer that also takes dynamic lights
+        self.lightmap = Lightmap(self.night_alpha)
+        # Cone clipped against collision rects; shared by the overlay and the freeze test
+        self.flashlight_visibility = None
+        self.flashlight_visibility_key = None
+        self.flashlight_aim_step = 0.5  # degrees; the cast is reused while the aim stays within one step
+        self.flashlight_pierce = 64  # px the beam reaches into an occluder, lighting its near face
+        self.muzzle_flash_time = 0
+        self.muzzle_flash_duration = 80  # ms
+        self.muzzle_flash_pos = (0, 0)
+        # Pooled full-screen surfaces for freeze / dim / game-over passes
+        self.screen_effects = ScreenEffects()
         
         self.enemy_event = pygame.event.custom_type()
         self.enemy_spawn_rate = 1200  # Start slower (was 300)
@@ -186,40 +223,87 @@ class Game:
         self.load_images()
         self.setup()
 
-    def _vector_angle_deg(self, a, b):
-        """Return angle in degrees between 2 vectors a and b (both pygame.Vector2)."""
-        if a.length_squared() == 0 or b.length_squared() == 0:
-            return 180
-        cosang = max(-1.0, min(1.0, a.normalize().dot(b.normalize())))
-        import math
-        return math.degrees(math.acos(cosang))
+    def camera_rect(self):
+        """World-space rect the last frame was drawn from."""
+        offset = self.all_sprites.offset
+        return pygame.FRect(-offset.x, -offset.y, WINDOW_WIDTH, WINDOW_HEIGHT)
 
     def enemy_in_flashlight(self, enemy_pos):
         """Check if an enemy (world coords) is within the flashlight cone from the player."""
-        if not self.flashlight_enabled or not hasattr(self, 'gun'):
-            return False
-        player_pos = pygame.Vector2(self.player.rect.center)
-        to_enemy = pygame.Vector2(enemy_pos) - player_pos
-        dist = to_enemy.length()
-        # Ignore targets closer than the start offset to match the visual gap
-        if dist < getattr(self, 'flashlight_start_offset', 0):
-            return False
-        if dist > self.flashlight_length:
-            return False
-        # Use gun direction
+        return bool(self.enemies_in_flashlight([enemy_pos])[0])
+
+    def enemies_in_flashlight(self, centers):
+        """Batch cone + shadow test for a list of world positions; returns one bool per position.
+
+        Squared distances are compared against the start offset and beam length,
+        and the aim dot product against the precomputed cosine of the half angle,
+        so with NumPy the whole horde is a handful of array operations.
+        """
+        count = len(centers)
+        if not count or not self.flashlight_enabled or not hasattr(self, 'gun'):
+            return [False] * count
+        px, py = self.player.rect.center
         dir_vec = pygame.Vector2(getattr(self.gun, 'player_dir', (1, 0)))
-        ang = self._vector_angle_deg(dir_vec, to_enemy)
-        return ang <= (self.flashlight_angle_deg / 2)
+        if dir_vec.length_squared() == 0:
+            return [False] * count
+        dir_x, dir_y = dir_vec.normalize()
+        visibility = self.get_flashlight_visibility()
+
+        if np is None:
+            lit = []
+            for x, y in centers:
+                dx, dy = x - px, y - py
+                dist_sq = dx * dx + dy * dy
+                # Ignore targets closer than the start offset to match the visual gap
+                in_cone = (self.flashlight_start_sq <= dist_sq <= self.flashlight_length_sq and
+                           dx * dir_x + dy * dir_y >= self.flashlight_cos_half * math.sqrt(dist_sq))
+                # Enemies hidden behind walls / objects are in shadow
+                lit.append(in_cone and (visibility is None or visibility.contains((x, y))))
+            return lit
+
+        points = np.asarray(centers, dtype=np.float64).reshape(count, 2)
+        dx = points[:, 0] - px
+        dy = points[:, 1] - py
+        dist_sq = dx * dx + dy * dy
+        lit = ((dist_sq >= self.flashlight_start_sq) & (dist_sq <= self.flashlight_length_sq) &
+               (dx * dir_x + dy * dir_y >= self.flashlight_cos_half * np.sqrt(dist_sq)))
+        if visibility is not None and lit.any():
+            lit[lit] = visibility.contains_many(points[lit, 0], points[lit, 1])
+        return lit
+
+    def get_flashlight_visibility(self):
+        """Visibility polygon of the flashlight cone (world coords).
+
+        The cast is keyed on the player's whole-pixel position and the aim angle
+        quantized to flashlight_aim_step, so sub-pixel drift and mouse jitter
+        reuse the last polygon instead of recasting it.
+        """
+        if not self.flashlight_enabled or not hasattr(self, 'gun') or not hasattr(self, 'occluder_grid'):
+            return None
+        dir_vec = pygame.Vector2(getattr(self.gun, 'player_dir', (1, 0)))
+        if dir_vec.length_squared() == 0:
+            dir_vec = pygame.Vector2(1, 0)
+        origin = round(self.player.rect.centerx), round(self.player.rect.centery)
+        step = round(math.degrees(math.atan2(dir_vec.y, dir_vec.x)) / self.flashlight_aim_step)
+        key = (origin, step)
+        if key != self.flashlight_visibility_key:
+            # Cast from the quantized origin and aim, so the polygon is the same for every hit on the key
+            aim = math.radians(step * self.flashlight_aim_step)
+            self.flashlight_visibility = cast_cone(origin, (math.cos(aim), math.sin(aim)), self.flashlight_length,
+                                                   math.radians(self.flashlight_angle_deg / 2),
+                                                   self.occluder_grid, pierce = self.flashlight_pierce)
+            self.flashlight_visibility_key = key
+        return self.flashlight_visibility
 
     def draw_flashlight_overlay(self):
         """Darken the screen with a soft, realistic flashlight beam that starts a bit ahead of the player.
 
-        Implements a rounded beam with inner cutoff (no triangle apex at the player) and smooth falloff.
+        The rounded beam (inner cutoff, smooth falloff, warm tint and player glow) is pre-rendered
+        by FlashlightCone; this only positions the cached variant for the current aim. Dynamic
+        lights (shop lantern, muzzle flash, bullets) are accumulated into the same Lightmap.
         """
         if not self.flashlight_enabled or not hasattr(self, 'gun'):
             return
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, self.night_alpha))  # base darkness
 
         # Calculate player's screen position based on camera offset
         player_world_pos = self.player.rect.center
@@ -233,68 +317,37 @@ class Game:
         if dir_vec.length_squared() == 0:
             dir_vec = pygame.Vector2(1, 0)
 
-        import math
-        half_angle_rad = math.radians(self.flashlight_angle_deg / 2)
-
-        # Place the beam emitter slightly ahead of the player to avoid a pointy look at the origin
-        emitter = origin + dir_vec * getattr(self, 'flashlight_start_offset', 0)
-
-        def ring_points(inner_r, outer_r, angle_scale=1.0, steps=28):
-            """Return points approximating an annular sector (ring slice) centered at emitter."""
-            pts = []
-            start = -half_angle_rad * angle_scale
-            end = half_angle_rad * angle_scale
-            # Outer arc from left to right
-            for i in range(steps + 1):
-                t = start + (end - start) * (i / steps)
-                ct = math.cos(t)
-                st = math.sin(t)
-                rx = dir_vec.x * ct - dir_vec.y * st
-                ry = dir_vec.x * st + dir_vec.y * ct
-                pts.append(emitter + pygame.Vector2(rx, ry) * outer_r)
-            # Inner arc from right back to left
-            for i in range(steps, -1, -1):
-                t = start + (end - start) * (i / steps)
-                ct = math.cos(t)
-                st = math.sin(t)
-                rx = dir_vec.x * ct - dir_vec.y * st
-                ry = dir_vec.x * st + dir_vec.y * ct
-                pts.append(emitter + pygame.Vector2(rx, ry) * inner_r)
-            return pts
-
-        # Draw gradient falloff from outside to inside using multiple sectors
-        # Each layer overwrites alpha with a lower value, producing a smooth transition
-        # Each layer: (inner_scale, outer_scale, alpha, angle_scale)
-        so = getattr(self, 'flashlight_start_offset', 0)
-        L = self.flashlight_length
-        clamp = lambda v: max(0, min(255, int(v)))
-        layers = [
-            (so, L * 0.95, clamp(self.night_alpha - 60), 1.00),
-            (so, L * 0.85, clamp(self.night_alpha - 110), 0.98),
-            (so, L * 0.72, clamp(self.night_alpha - 150), 0.95),
-            (so, L * 0.58, clamp(self.night_alpha - 180), 0.92),
-            (so, L * 0.45, 40, 0.90),
-            (so, L * 0.33, 15, 0.88),
-            (so, L * 0.22, 0, 0.85),  # inner core fully clear, begins at the offset
-        ]
-
-        for inner_r, outer_r, alpha, a_scale in layers:
-            pts = ring_points(inner_r, outer_r, angle_scale=a_scale, steps=28)
-            pygame.draw.polygon(overlay, (0, 0, 0, alpha), pts)
-
-        # Warm light tint inside cone for a more realistic torch hue
-        light_tint = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        tint_pts = ring_points(so, L * 0.5, angle_scale=0.92, steps=28)
-        pygame.draw.polygon(light_tint, (255, 240, 180, 28), tint_pts)
+        lightmap = self.lightmap
+        lightmap.begin()
+        # Beam and tint are cut to the visibility polygon so walls cast shadows
+        mask = None
+        visibility = self.get_flashlight_visibility()
+        if visibility is not None:
+            mask = lightmap.polygon_mask(visibility.screen_points(camera_offset, lightmap.scale))
+        self.flashlight_cone.draw_beam(lightmap.buffer, origin, dir_vec, mask)
+        self.add_dynamic_lights(camera_offset)
+        lightmap.apply_lights()
+        self.flashlight_cone.draw_tint(lightmap.buffer, origin, dir_vec, mask)
+        lightmap.present(self.screen)
 
-        # Small glow around player for ambient spill
-        glow = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        pygame.draw.circle(glow, (255, 240, 200, 36), origin + dir_vec * (so * 0.4), 70)
-
-        # Composite
-        self.screen.blit(overlay, (0, 0))
-        self.screen.blit(light_tint, (0, 0))
-        self.screen.blit(glow, (0, 0))
+    def add_dynamic_lights(self, camera_offset):
+        """Queue world lights for this frame's lightmap (positions converted to screen coords)."""
+        lightmap = self.lightmap
+        ox, oy = camera_offset.x, camera_offset.y
+        
+        # Shop lantern
+        if hasattr(self, 'shop_sprite'):
+            lightmap.add_point((self.shop_sprite.rect.centerx + ox, self.shop_sprite.rect.centery + oy), 220, 0.8)
+        
+        # Muzzle flash, fading out over its duration
+        flash_age = pygame.time.get_ticks() - self.muzzle_flash_time
+        if flash_age < self.muzzle_flash_duration:
+            intensity = 1 - flash_age / self.muzzle_flash_duration
+            lightmap.add_point((self.muzzle_flash_pos[0] + ox, self.muzzle_flash_pos[1] + oy), 160, intensity)
+        
+        # Bullets carry a small glow
+        for bullet in self.bullet_sprites:
+            lightmap.add_point((bullet.rect.centerx + ox, bullet.rect.centery + oy), 56, 0.6)
     
     def draw_enemy_ghosts(self):
         """THEME: Memory Overload - Draw enhanced fading ghosts showing last known enemy positions."""
@@ -488,7 +541,11 @@ class Game:
                     self.screen.blit(tile_surf, (minimap_x + int(rel_x), minimap_y + int(rel_y)))
             
             # Draw enemies on minimap (ONLY in non-faded discovered areas OR under flashlight)
-            for enemy in self.enemy_sprites:
+            # Only enemies within the minimap's tile window are looked up
+            view_tiles = (self.minimap_size // 2) // self.minimap_scale + 1
+            minimap_view = pygame.FRect((player_tile_x - view_tiles) * TILE_SIZE, (player_tile_y - view_tiles) * TILE_SIZE,
+                                        (view_tiles * 2 + 1) * TILE_SIZE, (view_tiles * 2 + 1) * TILE_SIZE)
+            for enemy in self.enemy_grid.query_rect(minimap_view):
                 if enemy.death_time == 0:  # Only living enemies
                     enemy_tile_x = int(enemy.rect.centerx // TILE_SIZE)
                     enemy_tile_y = int(enemy.rect.centery // TILE_SIZE)
@@ -589,9 +646,12 @@ class Game:
             new_speed = 400
         
         # Update existing enemies' speed to match current difficulty
-        for enemy in self.enemy_sprites:
-            if enemy.death_time == 0:  # Only living enemies
-                enemy.speed = new_speed
+        if self.horde:
+            self.horde.set_speed(new_speed)
+        else:
+            for enemy in self.enemy_sprites:
+                if enemy.death_time == 0:  # Only living enemies
+                    enemy.speed = new_speed
         
         # Only update spawn timer if rate changed significantly
         if abs(new_rate - self.enemy_spawn_rate) > 50:
@@ -723,7 +783,9 @@ class Game:
             if self.shoot_sound:
                 self.shoot_sound.play()
             pos = self.gun.rect.center + self.gun.player_dir *  50
-            Bullet(self.bullet_surface, pos, self.gun.player_dir, (self.all_sprites,self.bullet_sprites))
+            self.bullet_pool.spawn(pos, self.gun.player_dir)
+            self.muzzle_flash_time = pygame.time.get_ticks()
+            self.muzzle_flash_pos = pos
             self.can_shoot = False
             self.gun_time = pygame.time.get_ticks()
            
@@ -736,16 +798,22 @@ class Game:
          self.boundary_rect = pygame.Rect(0, 0, map_width, map_height)
          print(f"Map boundary set to: {self.boundary_rect}")
          
+         # Flashlight shadows: the invisible collision areas plus only the trunk / base of each prop
+         shadow_rects = []
          for opj in map.get_layer_by_name('Collisions'):
                collision_surface = pygame.Surface((opj.width, opj.height))
                collision_surface.fill('red')
-               CollisionSprite((opj.x, opj.y), collision_surface, self.collision_sprites)
+               shadow_rects.append(CollisionSprite((opj.x, opj.y), collision_surface, self.collision_sprites).rect)
                
-         for x , y , img in map.get_layer_by_name('Ground').tiles():
-             Sprite((x * TILE_SIZE, y * TILE_SIZE), img, self.all_sprites)
+         # Ground tiles are baked into chunk surfaces instead of one Sprite per tile
+         self.ground_layer = TileLayer(map, ['Ground'])
+         self.all_sprites.tile_layers.append(self.ground_layer)
          
          for opj in map.get_layer_by_name('Objects'):
              CollisionSprite((opj.x, opj.y), opj.image, (self.all_sprites, self.collision_sprites))
+             footprint = occluder_rect(opj.image, (opj.x, opj.y))
+             if footprint:
+                 shadow_rects.append(footprint)
              
          for obj in map.get_layer_by_name("Entities"):
              if obj.name == "Player":
@@ -760,6 +828,39 @@ class Game:
              else:
                  self.enemy_position.append((obj.x, obj.y))
          
+         # Static collision rects merged and bucketed once; used for wall and bullet collisions
+         collision_rects = [sprite.rect for sprite in self.collision_sprites]
+         merged_rects = merge_rects(collision_rects)
+         self.collision_rect_counts = (len(collision_rects), len(merged_rects))  # shown by the F3 overlay
+         self.collision_grid = StaticSpatialHash(merged_rects)
+         self.occluder_grid = StaticSpatialHash(merge_rects(shadow_rects))
+         self.player.collision_grid = self.collision_grid
+         # Walkable tiles and the shared path field enemies follow toward the player
+         self.walk_grid = TileGrid(merged_rects, self.boundary_rect.width, self.boundary_rect.height)
+         self.flow_field = FlowField(self.walk_grid)
+         self.flow_field.update(self.player.rect.center)
+         self.line_of_sight = LineOfSight(self.walk_grid)
+         self.spawn_points = SpawnPoints(self.enemy_position)
+         
+         # Bullets are recycled; any that leave the map are culled
+         self.bullet_pool = ProjectilePool(
+             lambda pos, direction: Bullet(self.bullet_surface, pos, direction, (), self.collision_grid),
+             (self.all_sprites, self.bullet_sprites), self.boundary_rect)
+         # Enemies are recycled too: killed ones are reset and reused by the next spawn
+         self.enemy_pool = SpritePool(
+             lambda pos, frames, stationary: Enemy(pos, frames, (), self.player, self.collision_sprites,
+                                                   stationary, self.collision_grid, self.flow_field,
+                                                   self.enemy_grid, self.line_of_sight),
+             (self.all_sprites, self.enemy_sprites))
+         # With NumPy, enemies are moved and animated in batch instead of one Enemy.update each
+         if HORDE_ENGINE and HORDE_AVAILABLE:
+             self.horde = HordeEngine(self.collision_grid.rects, self.boundary_rect.size, self.flow_field,
+                                      self.line_of_sight)
+         else:
+             self.horde = None
+         if not DYNAMIC_LIGHTS_AVAILABLE:
+             print("NumPy not available: dynamic lights disabled")
+         
          self.setup_intro_npcs()
     
     def setup_intro_npcs(self):
@@ -772,11 +873,15 @@ class Game:
         # Set boundary on camera
         if self.boundary_rect:
             self.all_sprites.boundary_rect = self.boundary_rect
+        
+        # NPCs don't move; bucket them once
+        self.interactable_grid.rebuild(self.npc_sprites)
 
     def check_npc_interaction(self):
         if self.game_mode == "INTRO" and not self.npc_dialogue.active:
             player_rect = self.player.rect
-            for npc in self.npc_sprites:
+            # Interaction rects reach 20px past the NPC rect
+            for npc in self.interactable_grid.query_rect(player_rect.inflate(40, 40)):
                 if npc.get_interaction_rect().colliderect(player_rect):
                     return npc
         return None
@@ -810,7 +915,8 @@ class Game:
 
     def player_collision(self):
         if self.game_mode == "EXPLORATION" and self.story_mode:
-            collided_enemies = pygame.sprite.spritecollide(self.player, self.enemy_sprites, False, pygame.sprite.collide_mask)
+            collided_enemies = [enemy for enemy in self.enemy_grid.query_rect(self.player.rect)
+                                if collide_rect_mask(self.player, enemy)]
             if collided_enemies:
                 self.start_undertale_battle(collided_enemies[0])
         elif self.game_mode == "UNDERTALE_BATTLE":
@@ -847,7 +953,8 @@ class Game:
     def bullet_collision(self):
         if self.bullet_sprites:
             for bullet in self.bullet_sprites:
-                collision_sprite = pygame.sprite.spritecollide(bullet, self.enemy_sprites, False, pygame.sprite.collide_mask)
+                collision_sprite = [enemy for enemy in self.enemy_grid.query_rect(bullet.rect)
+                                    if collide_rect_mask(bullet, enemy)]
                 if collision_sprite:
                     if self.impact_sound:
                         self.impact_sound.play()
@@ -1224,6 +1331,8 @@ class Game:
                         pygame.event.set_grab(False)
                         pygame.quit()
                         sys.exit()
+                    elif event.key == pygame.K_F3:
+                        self.show_collision_debug = not self.show_collision_debug
                     elif self.game_over:
                         if event.key == pygame.K_ESCAPE:
                             self.running = False
@@ -1246,7 +1355,11 @@ class Game:
                         pass
                     else:
                         stationary = self.story_mode
-                        enemy = Enemy(choice(self.enemy_position), choice(list(self.enemy_frames.values())), (self.all_sprites, self.enemy_sprites), self.player, self.collision_sprites, stationary)
+                        # Spawn just off screen near the player; anywhere if no point is in range
+                        spawn_pos = self.spawn_points.pick(self.camera_rect(), self.player.rect.center, SPAWN_RING)
+                        if spawn_pos is None:
+                            spawn_pos = choice(self.enemy_position)
+                        enemy = self.enemy_pool.spawn(spawn_pos, choice(list(self.enemy_frames.values())), stationary)
                         
                         # Scale enemy speed based on coins (progression)
                         if self.coins <= 50:
@@ -1260,6 +1373,9 @@ class Game:
                         else:
                             enemy.speed = 400  # Faster in late game
                         
+                        if self.horde:
+                            self.horde.add(enemy)
+                        
                         if self.story_mode:
                             self.story_enemies_spawned += 1
 
@@ -1292,20 +1408,45 @@ class Game:
                         self.update_enemy_blinking(dt)
                         
                         self.input()
+                        # Re-path the horde only when the player entered another tile
+                        self.flow_field.update(self.player.rect.center)
+                        self.line_of_sight.new_frame()
+                        # Enemies off screen update less often (LOD tiers by distance to the camera)
+                        camera = self.camera_rect()
+                        if not self.horde:
+                            for enemy in self.enemy_sprites:
+                                tier = lod_tier(enemy.hitbox.center, camera)
+                                if enemy.lod != tier:
+                                    enemy.lod = tier
+                                    enemy.schedule()  # idle enemies sleep off screen
                         # Update sprites (movement/animation)
                         self.all_sprites.update(dt)
+                        if self.horde:
+                            self.horde.update(dt, self.player.rect.center, chase = not self.player_invisible,
+                                              view = camera)
+                        self.bullet_pool.cull()
                         # Freeze enemies that are within the flashlight cone and pass light direction
                         if self.flashlight_enabled and hasattr(self, 'gun'):
                             light_direction = self.gun.player_dir
-                            for enemy in self.enemy_sprites:
-                                enemy.frozen_by_light = self.enemy_in_flashlight(enemy.rect.center)
+                            if self.horde:
+                                enemies = self.horde.sprites
+                                lit = self.enemies_in_flashlight(self.horde.centers())
+                                self.horde.frozen[:self.horde.count] = lit
+                            else:
+                                enemies = self.enemy_sprites.sprites()
+                                lit = self.enemies_in_flashlight([enemy.rect.center for enemy in enemies])
+                            for enemy, in_light in zip(enemies, lit):
+                                if enemy.frozen_by_light != bool(in_light):
+                                    enemy.frozen_by_light = bool(in_light)
+                                    enemy.schedule()  # frozen enemies off screen sleep until the light leaves them
                                 enemy.light_direction = light_direction
+                        self.enemy_grid.rebuild(self.enemy_sprites)
                         self.bullet_collision()
                         if self.story_mode and self.game_mode == "EXPLORATION":
                             self.player_collision()
                         else:
                             # In survival mode, enemies deal 5 damage on contact
-                            if pygame.sprite.spritecollide(self.player, self.enemy_sprites, False, pygame.sprite.collide_mask):
+                            if any(collide_rect_mask(self.player, enemy) for enemy in self.enemy_grid.query_rect(self.player.rect)):
                                 self.take_damage(5)
                         
                         # Update damage cooldown
@@ -1331,6 +1472,25 @@ class Game:
                     # Night/flashlight overlay after world draw, before UI
                     if self.flashlight_enabled:
                         self.draw_flashlight_overlay()
+                    if self.show_collision_debug:
+                        self.collision_grid.draw_debug(self.screen, self.all_sprites.offset)
+                        self.flow_field.draw_debug(self.screen, self.all_sprites.offset)
+                        pool_text = self.font.render(f"Bullets: {self.bullet_pool.stats()}", True, (255, 0, 255))
+                        self.screen.blit(pool_text, (10, WINDOW_HEIGHT - 40))
+                        pool_text = self.font.render(f"Enemies: {self.enemy_pool.stats()}", True, (255, 0, 255))
+                        self.screen.blit(pool_text, (10, WINDOW_HEIGHT - 80))
+                        sight_text = self.font.render(f"Sight: {self.line_of_sight.queries} queries / "
+                                                      f"{self.line_of_sight.walks} walks", True, (255, 0, 255))
+                        self.screen.blit(sight_text, (10, WINDOW_HEIGHT - 120))
+                        before, after = self.collision_rect_counts
+                        grid_text = self.font.render(f"Collision: {before} -> {after} rects", True, (255, 0, 255))
+                        self.screen.blit(grid_text, (10, WINDOW_HEIGHT - 160))
+                        updates = "horde (NumPy)" if self.horde else "per sprite"
+                        update_text = self.font.render(f"Enemy updates: {updates}", True, (255, 0, 255))
+                        self.screen.blit(update_text, (10, WINDOW_HEIGHT - 200))
+                        draw_lod_radar(self.screen, pygame.Rect(WINDOW_WIDTH - 250, WINDOW_HEIGHT - 250, 240, 240),
+                                       self.camera_rect(),
+                                       [(enemy.rect.center, enemy.lod) for enemy in self.enemy_sprites], self.font)
                     
                     # THEME: Draw blinking enemies overlay
                     self.draw_blinking_enemies()
@@ -1367,9 +1527,7 @@ class Game:
                     
                     # Draw dark overlay when shop is open
                     if self.shop_open:
-                        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-                        overlay.fill((0, 0, 0, 180))
-                        self.screen.blit(overlay, (0, 0))
+                        self.screen_effects.dim(self.screen, 180)
                     
                     if self.game_mode == "INTRO":
                         # Minimal intro screen: press ENTER to begin
@@ -1383,10 +1541,7 @@ class Game:
                     
                     self.npc_dialogue.draw(self.screen)
                 else:
-                    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-                    overlay.set_alpha(200)
-                    overlay.fill((0, 0, 0))
-                    self.screen.blit(overlay, (0, 0))
+                    self.screen_effects.dim(self.screen, 200)
                     
                     if hasattr(self, 'story_complete') and self.story_complete:
                         game_over_text = self.game_over_font.render("REFLECTION", True, (255, 215, 0))
@@ -1457,10 +1612,7 @@ class Game:
             
             # Add freeze effect overlay
             if self.freeze_timer:
-                freeze_overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-                freeze_overlay.set_alpha(30)
-                freeze_overlay.fill((150, 200, 255))  # Light blue freeze effect
-                self.screen.blit(freeze_overlay, (0, 0))
+                self.screen_effects.tint(self.screen, (150, 200, 255), 30)  # Light blue freeze effect
             
             # Update and draw pygame_gui
             self.ui_manager.update(dt)
@@ -0,0 +1,247 @@
+from settings import *
+from collections import deque
+import math
+
+try:
+    import numpy as np
+except ImportError:  # lookups go through direction_at() one position at a time
+    np = None
+
+
+class TileGrid:
+    """Walkable map tiles, rasterized once from the static collision rects.
+
+    A tile is blocked when its centre lies inside a collision rect. Out of
+    map tiles count as blocked.
+    """
+    def __init__(self, rects, width, height, tile_size = TILE_SIZE):
+        self.tile_size = tile_size
+        self.width = math.ceil(width / tile_size)
+        self.height = math.ceil(height / tile_size)
+        self.blocked = bytearray(self.width * self.height)  # row-major, index = y * width + x
+        for rect in rects:
+            # Tiles whose centre (x + 0.5) * tile_size falls in [left, right)
+            x0 = max(0, math.ceil(rect.left / tile_size - 0.5))
+            x1 = min(self.width, math.ceil(rect.right / tile_size - 0.5))
+            y0 = max(0, math.ceil(rect.top / tile_size - 0.5))
+            y1 = min(self.height, math.ceil(rect.bottom / tile_size - 0.5))
+            for y in range(y0, y1):
+                start = y * self.width
+                self.blocked[start + x0:start + x1] = b'\x01' * max(0, x1 - x0)
+
+    def tile_of(self, pos):
+        return int(pos[0] // self.tile_size), int(pos[1] // self.tile_size)
+
+    def in_bounds(self, tile_x, tile_y):
+        return 0 <= tile_x < self.width and 0 <= tile_y < self.height
+
+    def is_blocked(self, tile_x, tile_y):
+        if self.in_bounds(tile_x, tile_y):
+            return self.blocked[tile_y * self.width + tile_x] == 1
+        return True
+
+
+class FlowField:
+    """Shared path directions toward one target (the player) over a TileGrid.
+
+    A BFS from the target's tile gives every walkable tile its step count to
+    the target; each tile then points at its neighbour closest to the target.
+    The field is only rebuilt when the target enters a new tile, and an
+    enemy's path step is a single lookup, however many enemies there are.
+    """
+    neighbours = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+    def __init__(self, grid):
+        self.grid = grid
+        size = grid.width * grid.height
+        self.target_tile = None
+        self.distance = [-1] * size   # BFS steps to the target tile, -1 when unreachable
+        self.dir_x = [0.0] * size
+        self.dir_y = [0.0] * size
+        self.valid = bytearray(size)  # 1 where the tile has a direction
+        self.arrays = None            # (dir_x, dir_y, valid) as NumPy arrays for batch lookups
+        self.rebuilds = 0
+
+    def update(self, target):
+        """Rebuild the field if target moved to another tile; returns True when it did."""
+        tile = self.grid.tile_of(target)
+        if tile == self.target_tile or not self.grid.in_bounds(*tile):
+            return False
+        self.target_tile = tile
+        self.rebuild(tile)
+        return True
+
+    def rebuild(self, tile):
+        grid = self.grid
+        width, height, blocked = grid.width, grid.height, grid.blocked
+        distance = self.distance = [-1] * (width * height)
+        start = tile[1] * width + tile[0]
+        distance[start] = 0  # seeded even when the target stands on a blocked tile
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            x, y = i % width, i // width
+            step = distance[i] + 1
+            for nx, ny, n in ((x + 1, y, i + 1), (x - 1, y, i - 1), (x, y + 1, i + width), (x, y - 1, i - width)):
+                if 0 <= nx < width and 0 <= ny < height and distance[n] < 0 and not blocked[n]:
+                    distance[n] = step
+                    queue.append(n)
+        self.point_tiles(distance)
+        self.rebuilds += 1
+
+    def point_tiles(self, distance):
+        """Point each reachable tile at its nearest-to-target neighbour.
+
+        Diagonals only count where both side tiles are reachable, so paths never
+        cut a wall corner. The target tile and its neighbours get no direction:
+        there enemies seek the target directly.
+        """
+        width, height = self.grid.width, self.grid.height
+        diagonal = math.sqrt(0.5)
+        if np is not None:
+            # Same scan as below, one shifted copy of the distance grid per neighbour
+            dist = np.array(distance).reshape(height, width)
+            far = width * height + 1  # stands in for unreachable / off map
+            padded = np.full((height + 2, width + 2), far)
+            padded[1:-1, 1:-1] = np.where(dist < 0, far, dist)
+            best = padded[1:-1, 1:-1].copy()
+            best_dx = np.zeros((height, width), dtype = np.int64)
+            best_dy = np.zeros((height, width), dtype = np.int64)
+            for dx, dy in self.neighbours:
+                near = padded[1 + dy:height + 1 + dy, 1 + dx:width + 1 + dx]
+                closer = near < best
+                if dx and dy:
+                    closer &= (padded[1:-1, 1 + dx:width + 1 + dx] < far) & (padded[1 + dy:height + 1 + dy, 1:-1] < far)
+                best = np.where(closer, near, best)
+                best_dx[closer] = dx
+                best_dy[closer] = dy
+            valid = ((dist > 1) & ((best_dx != 0) | (best_dy != 0))).ravel()
+            scale = np.where((best_dx != 0) & (best_dy != 0), diagonal, 1.0).ravel()
+            dir_x = np.where(valid, best_dx.ravel() * scale, 0.0)
+            dir_y = np.where(valid, best_dy.ravel() * scale, 0.0)
+            self.arrays = (dir_x, dir_y, valid)
+            self.dir_x, self.dir_y, self.valid = dir_x.tolist(), dir_y.tolist(), bytearray(valid.tobytes())
+            return
+
+        dir_x, dir_y, valid = [0.0] * len(distance), [0.0] * len(distance), bytearray(len(distance))
+        for i, dist in enumerate(distance):
+            if dist <= 1:
+                continue
+            x, y = i % width, i // width
+            best, best_dx, best_dy = dist, 0, 0
+            for dx, dy in self.neighbours:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                n = distance[ny * width + nx]
+                if n < 0 or n >= best:
+                    continue
+                if dx and dy and (distance[y * width + nx] < 0 or distance[ny * width + x] < 0):
+                    continue
+                best, best_dx, best_dy = n, dx, dy
+            if best_dx or best_dy:
+                scale = diagonal if best_dx and best_dy else 1
+                dir_x[i], dir_y[i], valid[i] = best_dx * scale, best_dy * scale, 1
+        self.dir_x, self.dir_y, self.valid = dir_x, dir_y, valid
+
+    def direction_at(self, pos):
+        """Unit step direction at a world position, or None (target tile, unreachable, off map)."""
+        tile_x, tile_y = self.grid.tile_of(pos)
+        if not self.grid.in_bounds(tile_x, tile_y):
+            return None
+        i = tile_y * self.grid.width + tile_x
+        if not self.valid[i]:
+            return None
+        return self.dir_x[i], self.dir_y[i]
+
+    def directions(self, positions):
+        """Batch direction_at() for an (n, 2) array: returns ((n, 2) directions, valid mask)."""
+        size = self.grid.tile_size
+        tile_x = (positions[:, 0] // size).astype(np.int64)
+        tile_y = (positions[:, 1] // size).astype(np.int64)
+        inside = (tile_x >= 0) & (tile_x < self.grid.width) & (tile_y >= 0) & (tile_y < self.grid.height)
+        index = np.where(inside, tile_y * self.grid.width + tile_x, 0)
+        dir_x, dir_y, valid = self.arrays
+        return np.column_stack((dir_x[index], dir_y[index])), inside & valid[index]
+
+    def draw_debug(self, surface, offset):
+        """Arrow stubs for the tiles on screen (world tiles shifted by the camera offset)."""
+        size = self.grid.tile_size
+        x0, y0 = max(0, int(-offset.x // size)), max(0, int(-offset.y // size))
+        x1 = min(self.grid.width, x0 + surface.get_width() // size + 2)
+        y1 = min(self.grid.height, y0 + surface.get_height() // size + 2)
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                i = y * self.grid.width + x
+                centre = pygame.Vector2((x + 0.5) * size + offset.x, (y + 0.5) * size + offset.y)
+                if self.grid.blocked[i]:
+                    pygame.draw.circle(surface, (255, 0, 255), centre, 3)
+                elif self.valid[i]:
+                    tip = centre + pygame.Vector2(self.dir_x[i], self.dir_y[i]) * size * 0.35
+                    pygame.draw.line(surface, (0, 255, 255), centre, tip, 2)
+
+
+class LineOfSight:
+    """Answers "can A see B" by walking the tiles between them on a TileGrid.
+
+    The walk is a DDA between the two tile centres (Amanatides & Woo): a
+    blocked tile anywhere between the end tiles blocks the sight. Results are
+    cached per (tile, tile) pair until new_frame(), so a crowd standing on a
+    few tiles costs a few walks however many enemies ask.
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        self.cache = {}  # {(from_tile, to_tile): bool}, cleared every frame
+        self.queries = 0
+        self.walks = 0
+
+    def new_frame(self):
+        self.cache.clear()
+        self.queries = self.walks = 0
+
+    def can_see(self, a, b):
+        """True when nothing blocks the tiles between world positions a and b."""
+        return self.tiles_see(self.grid.tile_of(a), self.grid.tile_of(b))
+
+    def tiles_see(self, start, end):
+        self.queries += 1
+        key = (start, end)
+        seen = self.cache.get(key)
+        if seen is None:
+            seen = self.cache[key] = self.walk(start, end)
+        return seen
+
+    def walk(self, start, end):
+        self.walks += 1
+        (tx, ty), (ex, ey) = start, end
+        dx, dy = ex - tx, ey - ty
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # From centre to centre, the first tile boundary is half a tile away on each axis
+        t_max_x = 0.5 / abs(dx) if dx else float('inf')
+        t_max_y = 0.5 / abs(dy) if dy else float('inf')
+        t_delta_x = 1 / abs(dx) if dx else float('inf')
+        t_delta_y = 1 / abs(dy) if dy else float('inf')
+        for _ in range(abs(dx) + abs(dy) - 1):
+            if t_max_x < t_max_y:
+                tx += step_x
+                t_max_x += t_delta_x
+            else:
+                ty += step_y
+                t_max_y += t_delta_y
+            if self.grid.is_blocked(tx, ty):
+                return False
+        return True
+
+    def visible(self, positions, target):
+        """Batch can_see() from an (n, 2) array of positions to one target; returns a bool array.
+
+        Positions are grouped by tile first, so each occupied tile is walked once.
+        """
+        size, width = self.grid.tile_size, self.grid.width
+        tiles = (positions[:, 1] // size).astype(np.int64) * width + (positions[:, 0] // size).astype(np.int64)
+        unique, inverse = np.unique(tiles, return_inverse = True)
+        target_tile = self.grid.tile_of(target)
+        seen = np.array([self.tiles_see((int(tile) % width, int(tile) // width), target_tile) for tile in unique],
+                        dtype = bool)
+        return seen[inverse]
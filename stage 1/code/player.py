@@ -1,4 +1,5 @@
 from settings import *
+from support import frame_mask
 import os
 
 class Player(pygame.sprite.Sprite):
@@ -10,12 +11,14 @@ class Player(pygame.sprite.Sprite):
         self.state, self.frame_index = 'down', 0
         self.image = pygame.image.load(os.path.join(self.base_path, 'images', 'player','down','0.png')).convert_alpha()
         self.rect = self.image.get_frect(center = pos)
+        self.mask = frame_mask(self.image)
         self.hitbox = self.rect.inflate(-60, -90) 
         
         self.direction = pygame.Vector2()
         self.speed = 500
         self.collision_sprites = collision_sprites
         self.boundary_rect = None  # Set by game after setup
+        self.collision_grid = None  # StaticSpatialHash of wall rects, set by game after setup
 
     def frames(self):
         self.frames = {'left':[], 'right':[], 'up':[], 'down':[]}
@@ -43,6 +46,7 @@ class Player(pygame.sprite.Sprite):
             
         self.frame_index += 5  * dt if self.direction else 0
         self.image = self.frames[self.state][int(self.frame_index)%len(self.frames[self.state])]
+        self.mask = frame_mask(self.image)
 
     def move(self, dt):
         self.hitbox.y += self.direction.y * dt * self.speed
@@ -68,11 +72,16 @@ class Player(pygame.sprite.Sprite):
         self.animate(dt)
 
     def collision(self, direction):
-        for sprite in self.collision_sprites:
-            if self.hitbox.colliderect(sprite.rect):
+        # Only the wall rects overlapping the hitbox, when the grid is available
+        if self.collision_grid:
+            rects = self.collision_grid.query(self.hitbox)
+        else:
+            rects = [sprite.rect for sprite in self.collision_sprites]
+        for rect in rects:
+            if self.hitbox.colliderect(rect):
                 if direction == "vertical" :
-                    if self.direction.y > 0 : self.hitbox.bottom = sprite.rect.top
-                    if self.direction.y < 0 : self.hitbox.top = sprite.rect.bottom
+                    if self.direction.y > 0 : self.hitbox.bottom = rect.top
+                    if self.direction.y < 0 : self.hitbox.top = rect.bottom
                 if direction == "horizontal":
-                    if self.direction.x > 0 : self.hitbox.right = sprite.rect.left
-                    if self.direction.x < 0 : self.hitbox.left = sprite.rect.right
\ No newline at end of file
+                    if self.direction.x > 0 : self.hitbox.right = rect.left
+                    if self.direction.x < 0 : self.hitbox.left = rect.right
\ No newline at end of file
@@ -0,0 +1,54 @@
+from settings import *
+
+class SpritePool:
+    """Recycles sprites instead of allocating a new one per spawn.
+
+    A pooled sprite's kill() hands it back through release(), so every way
+    a sprite can die returns it to the free list. spawn() re-initialises a
+    free sprite with its reset() and re-adds it to the pool's groups; a new
+    sprite is only built when the free list is empty.
+    """
+    def __init__(self, factory, groups):
+        self.factory = factory  # builds a new sprite from the spawn() arguments
+        self.groups = groups
+        self.free = []
+        self.live = {}          # insertion-ordered set of live sprites
+        self.created = 0
+        self.high_water = 0     # most sprites alive at once
+
+    def spawn(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+        else:
+            sprite = self.factory(*args)
+            sprite.pool = self
+            self.created += 1
+        sprite.add(*self.groups)
+        self.live[sprite] = None
+        self.high_water = max(self.high_water, len(self.live))
+        return sprite
+
+    def release(self, sprite):
+        """Called from the sprite's kill(); returns it to the free list once."""
+        if sprite in self.live:
+            del self.live[sprite]
+            self.free.append(sprite)
+
+    def stats(self):
+        return f"{len(self.live)} live / {self.created} pooled (peak {self.high_water})"
+
+
+class ProjectilePool(SpritePool):
+    """SpritePool for bullets / muzzle flashes that also culls them outside a bounds rect."""
+    def __init__(self, factory, groups, bounds = None):
+        super().__init__(factory, groups)
+        self.bounds = bounds  # world rect; live projectiles outside it are culled
+
+    def cull(self):
+        """Kill live projectiles that have left the bounds."""
+        if self.bounds is None:
+            return
+        bounds = self.bounds
+        for sprite in [sprite for sprite in self.live if not bounds.colliderect(sprite.rect)]:
+            sprite.kill()
@@ -4,6 +4,23 @@ from os import walk
 
 WINDOW_WIDTH, WINDOW_HEIGHT = 1280,720 
 TILE_SIZE = 64
+# Move and animate enemies in batch with NumPy when it is installed (see horde.py)
+HORDE_ENGINE = True
+# Enemy crowd separation: push radius (px), steering weight, bucket mates checked per enemy
+SEPARATION_RADIUS = 56
+SEPARATION_WEIGHT = 1.5
+SEPARATION_NEIGHBOURS = 8
+# Enemy awareness: seconds an enemy keeps chasing after losing sight, and how often idle ones look
+SIGHT_MEMORY = 3.0
+SIGHT_RECHECK = 0.25
+# Enemy level of detail: width (px) of the throttled ring around the screen, and its step interval (s)
+LOD_NEAR_RING = 600
+LOD_NEAR_INTERVAL = 0.1
+# Seconds between the flow-field headings of coasting enemies beyond the near ring
+LOD_FAR_INTERVAL = 0.5
+# Enemies spawn at a point off screen but within this distance (px) of the player;
+# kept inside the near ring, so every spawn starts out thinking
+SPAWN_RING = WINDOW_HEIGHT // 2 + LOD_NEAR_RING
 
 # Vertical nudge for Shop NPC anchoring (negative lifts up)
 SHOP_Y_OFFSET = -64
\ No newline at end of file
@@ -0,0 +1,218 @@
+from settings import *
+from random import choice
+
+def merge_rects(rects):
+    """Merge hand-placed collision rects without changing the covered area.
+
+    Duplicates and rects inside another are dropped, and pairs whose union is
+    itself a rectangle (same span on one axis, touching or overlapping on the
+    other) are joined, until nothing changes. Returns a new list of FRects.
+    """
+    rects = [pygame.FRect(rect) for rect in rects]
+    changed = True
+    while changed:
+        changed = False
+        # Later duplicates and contained rects add nothing
+        kept = []
+        for i, rect in enumerate(rects):
+            if not any(other.contains(rect) and (other != rect or j < i)
+                       for j, other in enumerate(rects) if j != i):
+                kept.append(rect)
+        rects = kept
+
+        for i, a in enumerate(rects):
+            for j in range(i + 1, len(rects)):
+                b = rects[j]
+                same_rows = a.top == b.top and a.bottom == b.bottom and a.left <= b.right and b.left <= a.right
+                same_cols = a.left == b.left and a.right == b.right and a.top <= b.bottom and b.top <= a.bottom
+                if same_rows or same_cols:
+                    rects[i] = a.union(b)
+                    del rects[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return rects
+
+
+class StaticSpatialHash:
+    """Uniform grid over static world rects (walls, trees), built once at load time.
+
+    Each cell lists the indices of the rects overlapping it, so area queries
+    only look at rects near the query instead of scanning the whole map.
+    """
+    def __init__(self, rects, cell_size = 128):
+        self.cell_size = cell_size
+        self.rects = [pygame.FRect(rect) for rect in rects]
+        self.cells = {}  # {(cell_x, cell_y): [rect_index]}
+        for index, rect in enumerate(self.rects):
+            x0, x1, y0, y1 = self.cell_range(rect)
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(index)
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (int(rect.left // size), int((rect.right - 1e-6) // size),
+                int(rect.top // size), int((rect.bottom - 1e-6) // size))
+
+    def query(self, rect):
+        """Return the indexed rects overlapping rect."""
+        x0, x1, y0, y1 = self.cell_range(rect)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            # Common case for small hitboxes: a single cell, no duplicates possible
+            indices = cells.get((x0, y0), ())
+        else:
+            indices = set()
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    indices.update(cells.get((cx, cy), ()))
+        rects = self.rects
+        return [rects[i] for i in indices if rect.colliderect(rects[i])]
+
+    def raycast(self, start, end):
+        """First point where the segment start -> end enters an indexed rect, or None.
+
+        Walks the grid cells along the segment (DDA) and only clips against the
+        rects of visited cells, stopping at the first cell that holds a hit.
+        """
+        size = self.cell_size
+        x, y = start
+        dx, dy = end[0] - x, end[1] - y
+        cx, cy = int(x // size), int(y // size)
+        steps = abs(int(end[0] // size) - cx) + abs(int(end[1] // size) - cy)
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Segment parameter t (0..1) at the next vertical / horizontal cell boundary
+        t_max_x = ((cx + (dx > 0)) * size - x) / dx if dx else float('inf')
+        t_max_y = ((cy + (dy > 0)) * size - y) / dy if dy else float('inf')
+        t_delta_x = size / abs(dx) if dx else float('inf')
+        t_delta_y = size / abs(dy) if dy else float('inf')
+        length_sq = dx * dx + dy * dy
+
+        best_t, best_point = float('inf'), None
+        for _ in range(steps + 1):
+            for index in self.cells.get((cx, cy), ()):
+                for px, py in self.rects[index].clipline(start, end):
+                    t = ((px - x) * dx + (py - y) * dy) / length_sq if length_sq else 0
+                    if t < best_t:
+                        best_t, best_point = t, (px, py)
+            # A hit before leaving this cell can't be beaten by a later cell
+            if best_point is not None and best_t <= min(t_max_x, t_max_y):
+                break
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+        return best_point
+
+    def draw_debug(self, surface, offset):
+        """Outline the indexed rects (world rects shifted by the camera offset)."""
+        view = pygame.FRect(-offset.x, -offset.y, surface.get_width(), surface.get_height())
+        for rect in self.query(view):
+            pygame.draw.rect(surface, (255, 0, 255), rect.move(offset.x, offset.y), 2)
+
+
+class EntityGrid:
+    """Uniform grid of moving sprites for broad-phase and proximity queries.
+
+    Rebuilt from the sprites' rects once per frame. A sprite is bucketed in
+    every cell its rect overlaps, so queries only look at sprites nearby and
+    their cost follows local density instead of the total sprite count.
+    """
+    def __init__(self, cell_size = 128):
+        self.cell_size = cell_size
+        self.cells = {}  # {(cell_x, cell_y): [sprite]}
+        self.count = 0
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (int(rect.left // size), int((rect.right - 1e-6) // size),
+                int(rect.top // size), int((rect.bottom - 1e-6) // size))
+
+    def rebuild(self, sprites):
+        """Re-bucket every sprite at its current rect."""
+        cells = self.cells = {}
+        size = self.cell_size
+        count = 0
+        for sprite in sprites:
+            rect = sprite.rect
+            x0, x1 = int(rect.left // size), int((rect.right - 1e-6) // size)
+            y0, y1 = int(rect.top // size), int((rect.bottom - 1e-6) // size)
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket is None:
+                        cells[(cx, cy)] = [sprite]
+                    else:
+                        bucket.append(sprite)
+            count += 1
+        self.count = count
+
+    def candidates(self, rect):
+        """Sprites bucketed in the cells under rect, each once (no overlap test)."""
+        x0, x1, y0, y1 = self.cell_range(rect)
+        cells = self.cells
+        found = {}  # insertion-ordered set
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                for sprite in cells.get((cx, cy), ()):
+                    found[sprite] = None
+        return found
+
+    def buckets(self, pos, radius):
+        """The non-empty buckets of the cells under the square of half-size radius around pos."""
+        size = self.cell_size
+        x, y = pos
+        cells = self.cells
+        found = []
+        for cy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+            for cx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.append(bucket)
+        return found
+
+    def query_rect(self, rect):
+        """Sprites whose rect overlaps rect."""
+        return [sprite for sprite in self.candidates(rect) if rect.colliderect(sprite.rect)]
+
+
+class SpawnPoints:
+    """Enemy spawn points bucketed in a uniform grid, built once at load time.
+
+    pick() only visits the cells around the player, so choosing where the
+    next enemy appears costs the same however many points the map has.
+    """
+    def __init__(self, points, cell_size = 256):
+        self.cell_size = cell_size
+        self.points = [tuple(point) for point in points]
+        self.cells = {}  # {(cell_x, cell_y): [point]}
+        for point in self.points:
+            self.cells.setdefault((int(point[0] // cell_size), int(point[1] // cell_size)), []).append(point)
+
+    def near(self, pos, radius):
+        """Points within radius of pos."""
+        x, y = pos
+        size = self.cell_size
+        radius_sq = radius * radius
+        found = []
+        for cy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+            for cx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+                for point in self.cells.get((cx, cy), ()):
+                    if (point[0] - x) ** 2 + (point[1] - y) ** 2 <= radius_sq:
+                        found.append(point)
+        return found
+
+    def pick(self, view, pos, radius, margin = 96):
+        """Random point within radius of pos but off screen, or None if there is none.
+
+        view is the camera rect in world space; it is grown by margin so a
+        sprite centred on the point doesn't poke onto the screen.
+        """
+        hidden = view.inflate(margin * 2, margin * 2)
+        candidates = [point for point in self.near(pos, radius) if not hidden.collidepoint(point)]
+        return choice(candidates) if candidates else None
@@ -1,9 +1,15 @@
 from settings import *
+from support import frame_mask, death_silhouette, set_awake
+from lod import LOD_FULL, LOD_NEAR
 from math import atan2, degrees
+from random import randrange, uniform
 import os
 
 
 class Sprite(pygame.sprite.Sprite):
+    render_layer = 'ground'
+    static = True  # Never moves: AllSprites only depth-sorts it when membership changes
+    
     def __init__(self, pos, surface, groups):
         super().__init__(groups)
         self.image = surface
@@ -11,6 +17,8 @@ class Sprite(pygame.sprite.Sprite):
         self.ground = True
 
 class CollisionSprite(pygame.sprite.Sprite):
+    static = True  # Trees and props never move
+    
     def __init__(self, pos, surface, groups ):
         super().__init__(groups)
         self.image = surface
@@ -52,46 +60,104 @@ class Gun(pygame.sprite.Sprite):
         
         
 class Bullet(pygame.sprite.Sprite):
-    def __init__(self, surface, pos, direction, group):
+    pool = None  # ProjectilePool that recycles this bullet, if any
+    
+    def __init__(self, surface, pos, direction, group, collision_grid=None):
         super().__init__(group)
         self.image = surface
         self.rect = self.image.get_frect(center = pos)
-        self.spawn_time = pygame.time.get_ticks()
+        self.mask = frame_mask(self.image)
         self.lifetime = 1000 
+        self.speed = 1200
+        self.collision_grid = collision_grid  # StaticSpatialHash of walls; bullets stop on impact
+        self.reset(pos, direction)
         
+    def reset(self, pos, direction):
+        """(Re)start the bullet at pos; used again when a pooled bullet is reused."""
+        self.rect.center = pos
         self.direction = direction
-        self.speed = 1200
+        self.spawn_time = pygame.time.get_ticks()
         
+    def kill(self):
+        super().kill()
+        if self.pool:
+            self.pool.release(self)
         
     def update(self, dt):
+        start = self.rect.center
         self.rect.center += self.direction * self.speed * dt
+        # Trace the whole step so fast bullets can't skip over thin walls at low fps
+        if self.collision_grid and self.collision_grid.raycast(start, self.rect.center):
+            self.kill()
+            return
         if pygame.time.get_ticks() - self.spawn_time >= self.lifetime:
             self.kill()
             
             
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, pos, frames, groups, player, collision_sprites, stationary=False):
+    blinks = True  # Hidden by AllSprites during the blink phase
+    pool = None  # SpritePool that recycles this enemy, if any
+    horde = None  # HordeEngine that moves and animates this enemy, if any
+    horde_index = None  # slot in the horde arrays
+    
+    def __init__(self, pos, frames, groups, player, collision_sprites, stationary=False, collision_grid=None,
+                 flow_field=None, enemy_grid=None, line_of_sight=None):
         super().__init__(groups)
         self.player = player
+        self.animation_speed = 6
+        self.collision_sprites = collision_sprites
+        self.collision_grid = collision_grid  # StaticSpatialHash of the same wall rects
+        self.flow_field = flow_field  # shared FlowField toward the player
+        self.enemy_grid = enemy_grid  # EntityGrid of all enemies, for separation
+        self.line_of_sight = line_of_sight  # LineOfSight over the walkable tiles
+        self.death_duration = 400
+        self.reset(pos, frames, stationary)
         
+    def reset(self, pos, frames, stationary=False):
+        """(Re)spawn at pos with a frame set; used again when a pooled enemy is reused."""
         self.frames , self.frame_index = frames, 0
         self.image = self.frames[self.frame_index]
-        self.animation_speed = 6
+        self.mask = frame_mask(self.image)
         self.rect = self.image.get_frect(center = pos)
         self.hitbox = self.rect.inflate(-20, -40)
         
-        self.collision_sprites = collision_sprites
         self.direction = pygame.Vector2()
         self.speed = 350
         self.stationary = stationary  # New parameter for stationary enemies
+        self.frozen_by_light = False
+        self.wander_timer = 0
+        self.sight_memory = 0  # seconds of chasing left since the player was last seen
+        self.sight_timer = 0  # seconds until an idle enemy looks for the player again
+        self.pace = 1  # speed factor of the last move (wandering is slower)
+        self.lod = LOD_FULL  # update tier, set by the game from the distance to the camera
+        self.lod_dt = 0  # time banked while throttled in the near ring
+        self.heading_timer = 0  # seconds until a coasting far enemy re-reads its heading
         
         self.death_time = 0
-        self.death_duration = 400
+        self.schedule()
+        
+    def schedule(self):
+        """Sleep while update() would do nothing visible: moved by the horde, or idle off screen.
+
+        Stationary and frozen enemies keep animating on screen; off screen they
+        have nothing to animate or move. Called whenever one of those changes;
+        dying always wakes the enemy for its death timer.
+        """
+        idle = self.stationary or self.frozen_by_light
+        set_awake(self, self.death_time != 0 or not (self.horde or (idle and self.lod != LOD_FULL)))
+
+    def kill(self):
+        super().kill()
+        if self.horde:
+            self.horde.remove(self)
+        if self.pool:
+            self.pool.release(self)
         
         
     def animate(self, dt):
         self.frame_index += self.animation_speed * dt
         self.image = self.frames[int(self.frame_index) % len(self.frames)]
+        self.mask = frame_mask(self.image)
         
         
     def move(self, dt):
@@ -105,58 +171,180 @@ class Enemy(pygame.sprite.Sprite):
         # THEME: Invisibility - Can't chase invisible player
         if getattr(self.player, 'game', None):
             if getattr(self.player.game, 'player_invisible', False):
-                # Player is invisible, wander randomly
-                import random
-                if not hasattr(self, 'wander_timer'):
-                    self.wander_timer = 0
-                self.wander_timer += dt
-                if self.wander_timer > 2:  # Change direction every 2 seconds
-                    self.direction = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1))
-                    if self.direction.length() > 0:
-                        self.direction = self.direction.normalize()
-                    self.wander_timer = 0
-                
-                self.hitbox.x += self.direction.x * dt * self.speed * 0.3  # Slower wandering
-                self.collision("horizontal")
-                self.hitbox.y += self.direction.y * dt * self.speed * 0.3
-                self.collision("vertical")
-                self.rect.center = self.hitbox.center
+                self.wander(dt)
                 return
+        # Can't chase what it hasn't seen: idle until the player comes into view
+        if not self.aware(dt):
+            self.wander(dt)
+            return
             
-        player_pos = pygame.Vector2(self.player.rect.center)
-        enemy_pos = pygame.Vector2(self.rect.center)
-        self.direction = (player_pos - enemy_pos).normalize() 
+        self.direction = self.path_direction()
+        # Spread out instead of stacking on the same pixels
+        push = self.separation()
+        if push:
+            steer = self.direction + push * SEPARATION_WEIGHT
+            if steer.length_squared() > 0:
+                self.direction = steer.normalize()
 
+        self.pace = 1
         self.hitbox.x += self.direction.x * dt * self.speed
         self.collision("horizontal")
         self.hitbox.y += self.direction.y * dt * self.speed
         self.collision("vertical")
         self.rect.center = self.hitbox.center
 
+    def wander(self, dt):
+        """Slow random walk; the cheap update for enemies that aren't chasing."""
+        self.wander_timer += dt
+        if self.wander_timer > 2:  # Change direction every 2 seconds
+            self.direction = pygame.Vector2(uniform(-1, 1), uniform(-1, 1))
+            if self.direction.length() > 0:
+                self.direction = self.direction.normalize()
+            self.wander_timer = 0
+        
+        self.pace = 0.3  # Slower wandering
+        self.hitbox.x += self.direction.x * dt * self.speed * self.pace
+        self.collision("horizontal")
+        self.hitbox.y += self.direction.y * dt * self.speed * self.pace
+        self.collision("vertical")
+        self.rect.center = self.hitbox.center
+
+    def path_direction(self):
+        """Unit heading toward the player: the flow field around walls, straight at the player once close."""
+        step = self.flow_field.direction_at(self.hitbox.center) if self.flow_field else None
+        if step is not None:
+            return pygame.Vector2(step)
+        to_player = pygame.Vector2(self.player.rect.center) - pygame.Vector2(self.hitbox.center)
+        return to_player.normalize() if to_player else self.direction
+
+    def coast(self, dt):
+        """Far off screen: dead-reckon along a heading, no sight test, separation or collision.
+
+        Every LOD_FAR_INTERVAL the heading is re-read from the flow field, so
+        far enemies (fresh spawns included) keep closing in on the player
+        instead of idling; they think again once back in the near ring. The
+        enemy holds still rather than step onto a blocked walk tile, and takes
+        a new heading on the next frame. While the player is invisible the old
+        heading is kept.
+        """
+        if self.frozen_by_light or self.stationary:
+            return
+        self.heading_timer -= dt
+        if self.heading_timer <= 0 and not getattr(getattr(self.player, 'game', None), 'player_invisible', False):
+            self.heading_timer = LOD_FAR_INTERVAL
+            self.direction = self.path_direction()
+            self.pace = 1
+        x = self.hitbox.centerx + self.direction.x * dt * self.speed * self.pace
+        y = self.hitbox.centery + self.direction.y * dt * self.speed * self.pace
+        if self.flow_field and self.flow_field.grid.is_blocked(*self.flow_field.grid.tile_of((x, y))):
+            self.heading_timer = 0
+            return
+        self.hitbox.center = (x, y)
+        self.rect.center = self.hitbox.center
+
+    def aware(self, dt):
+        """Whether to chase: the player is in sight, or was within SIGHT_MEMORY seconds.
+
+        Chasers test their sight every frame; idle enemies only every
+        SIGHT_RECHECK seconds, so a map full of idle enemies stays cheap.
+        """
+        if not self.line_of_sight:
+            return True
+        if self.sight_memory <= 0:
+            self.sight_timer -= dt
+            if self.sight_timer > 0:
+                return False
+            self.sight_timer = SIGHT_RECHECK
+        if self.line_of_sight.can_see(self.hitbox.center, self.player.rect.center):
+            self.sight_memory = SIGHT_MEMORY
+        else:
+            self.sight_memory = max(0, self.sight_memory - dt)
+        return self.sight_memory > 0
+
+    def separation(self):
+        """Push away from nearby enemies in the grid buckets around this enemy.
+
+        The buckets of every cell within SEPARATION_RADIUS of the hitbox centre
+        are read (up to 2x2 cells while the radius is under a cell), so pairs
+        split by a cell border still push apart. At most SEPARATION_NEIGHBOURS
+        enemies are read in total, shared between those buckets, so the cost
+        per enemy stays constant however large the horde gets. A crowded
+        bucket is read from a random start so each enemy sees different mates.
+        Each neighbour inside SEPARATION_RADIUS adds a unit push that fades to
+        zero at the radius.
+
+        The grid is rebuilt after the enemies move, so bucket membership is a
+        frame old; the neighbours' positions themselves are current.
+        """
+        push = pygame.Vector2()
+        if not self.enemy_grid:
+            return push
+        x, y = self.hitbox.center
+        buckets = self.enemy_grid.buckets((x, y), SEPARATION_RADIUS)
+        if not buckets:
+            return push
+        share = -(-SEPARATION_NEIGHBOURS // len(buckets))  # ceil: reads per bucket
+        seen = {self}  # a sprite sits in every cell its rect overlaps
+        for bucket in buckets:
+            count = len(bucket)
+            start = randrange(count) if count > share else 0
+            for k in range(min(count, share)):
+                other = bucket[(start + k) % count]
+                if other in seen:
+                    continue
+                seen.add(other)
+                dx, dy = x - other.hitbox.centerx, y - other.hitbox.centery
+                dist_sq = dx * dx + dy * dy
+                if dist_sq == 0:
+                    # Stacked exactly (same spawn point): split the pair apart along x
+                    push.x += 1 if id(self) < id(other) else -1
+                elif dist_sq < SEPARATION_RADIUS * SEPARATION_RADIUS:
+                    dist = dist_sq ** 0.5
+                    scale = (1 - dist / SEPARATION_RADIUS) / dist
+                    push.x += dx * scale
+                    push.y += dy * scale
+        return push
+
     def collision(self, direction):
-         for sprite in self.collision_sprites:
-            if self.hitbox.colliderect(sprite.rect):
+         if self.collision_grid:
+            rects = self.collision_grid.query(self.hitbox)
+         else:
+            rects = [sprite.rect for sprite in self.collision_sprites]
+         for rect in rects:
+            if self.hitbox.colliderect(rect):
                 if direction == "vertical" :
-                    if self.direction.y > 0 : self.hitbox.bottom = sprite.rect.top
-                    if self.direction.y < 0 : self.hitbox.top = sprite.rect.bottom
+                    if self.direction.y > 0 : self.hitbox.bottom = rect.top
+                    if self.direction.y < 0 : self.hitbox.top = rect.bottom
                 if direction == "horizontal":
-                    if self.direction.x > 0 : self.hitbox.right = sprite.rect.left
-                    if self.direction.x < 0 : self.hitbox.left = sprite.rect.right
+                    if self.direction.x > 0 : self.hitbox.right = rect.left
+                    if self.direction.x < 0 : self.hitbox.left = rect.right
     def destroy(self):
         self.death_time = pygame.time.get_ticks()
-        surface = pygame.mask.from_surface(self.frames[0]).to_surface()
-        surface.set_colorkey("black")
-        self.image = surface
+        self.image = death_silhouette(self.frames[0])
+        self.mask = frame_mask(self.frames[0])  # the silhouette has the first frame's shape
+        if self.horde:
+            self.horde.mark_dying(self)
+        self.schedule()
     
     def death_timer(self):
         if pygame.time.get_ticks() - self.death_time >= self.death_duration:
             self.kill()
     def update(self , dt):
-        if self.death_time == 0:
-            self.animate(dt)
-            self.move(dt)
-        else:
+        if self.death_time != 0:
             self.death_timer()
+        elif self.horde is None:  # otherwise moved and animated in batch by the horde
+            if self.lod == LOD_FULL:
+                self.animate(dt)
+                self.move(dt + self.lod_dt)
+                self.lod_dt = 0
+            elif self.lod == LOD_NEAR:
+                # Off screen: no animation, and movement in coarser steps
+                self.lod_dt += dt
+                if self.lod_dt >= LOD_NEAR_INTERVAL:
+                    self.move(self.lod_dt)
+                    self.lod_dt = 0
+            else:
+                self.coast(dt)
             
             
 class Shop(pygame.sprite.Sprite):
@@ -194,7 +382,7 @@ class Shop(pygame.sprite.Sprite):
         self.anchor_pos = (pos[0], pos[1])
         self.rect = self.image.get_frect()
         self.rect.midbottom = self.anchor_pos
-        # No 'ground' attribute so it's treated as an object sprite
+        # Default render_layer, so it's treated as an object sprite
 
     def update(self, dt):
         self.frame_index += self.animation_speed * dt
@@ -0,0 +1,35 @@
+from settings import *
+
+# Collision masks and death silhouettes, computed once per frame surface and shared
+# by every sprite showing that frame (frames are long-lived, so the caches stay small)
+frame_masks = {}
+silhouettes = {}
+
+def frame_mask(surface):
+    """Collision mask of an animation frame, built on first use."""
+    mask = frame_masks.get(surface)
+    if mask is None:
+        mask = frame_masks[surface] = pygame.mask.from_surface(surface)
+    return mask
+
+def death_silhouette(surface):
+    """White, colour-keyed silhouette of a frame for death flashes, built once and shared."""
+    silhouette = silhouettes.get(surface)
+    if silhouette is None:
+        silhouette = frame_mask(surface).to_surface()
+        silhouette.set_colorkey("black")
+        silhouettes[surface] = silhouette
+    return silhouette
+
+def set_awake(sprite, awake):
+    """Wake a sprite or put it to sleep; sleeping sprites are skipped by AllSprites.update."""
+    if getattr(sprite, 'awake', True) != awake:
+        sprite.awake = awake
+        for group in sprite.groups():
+            reschedule = getattr(group, 'reschedule', None)
+            if reschedule:
+                reschedule(sprite)
+
+def collide_rect_mask(left, right):
+    """pygame.sprite.collide_mask behind a cheap rect test; uses the sprites' cached .mask."""
+    return left.rect.colliderect(right.rect) and pygame.sprite.collide_mask(left, right)
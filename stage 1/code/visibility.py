@@ -0,0 +1,171 @@
+from settings import *
+from bisect import bisect_left
+import math
+
+try:
+    import numpy as np
+except ImportError:  # contains_many falls back to per-point tests
+    np = None
+
+def _wrap_angle(angle):
+    """Wrap an angle in radians to [-pi, pi)."""
+    return (angle + math.pi) % math.tau - math.pi
+
+
+def occluder_rect(image, topleft):
+    """Tight shadow-casting rect of a prop image (tree trunk, rock base), or None if it's empty.
+
+    The narrowest opaque row in the lower half of the image gives the width;
+    the rect spans it from the middle of the image down to the lowest opaque
+    row, so a tree's canopy never casts a shadow.
+    """
+    bounds = image.get_bounding_rect()
+    if not bounds:
+        return None
+    top = bounds.centery
+    narrowest = None
+    for y in range(top, bounds.bottom):
+        row = image.subsurface((0, y, image.get_width(), 1)).get_bounding_rect()
+        if row.width and (narrowest is None or row.width < narrowest.width):
+            narrowest = row
+    if narrowest is None:
+        return None
+    return pygame.FRect(topleft[0] + narrowest.left, topleft[1] + top, narrowest.width, bounds.bottom - top)
+
+
+class VisibilityPolygon:
+    """Star-shaped region of a light cone left visible after occlusion.
+
+    Rays are stored in increasing angle relative to the cone direction, so a
+    point test is a binary search for the bracketing rays plus one edge check.
+    """
+    def __init__(self, origin, base_angle, half_angle, length, angles, points):
+        self.origin = origin
+        self.base_angle = base_angle
+        self.half_angle = half_angle
+        self.length = length
+        self.angles = angles    # relative ray angles, ascending
+        self.points = points    # world-space ray end points (hit or full length)
+        self.arrays = None      # (angles, xs, ys) as NumPy arrays, built on first batch test
+
+    def contains(self, point):
+        ox, oy = self.origin
+        dx = point[0] - ox
+        dy = point[1] - oy
+        if dx * dx + dy * dy > self.length * self.length:
+            return False
+        angle = _wrap_angle(math.atan2(dy, dx) - self.base_angle)
+        if abs(angle) > self.half_angle:
+            return False
+
+        angles = self.angles
+        i = bisect_left(angles, angle)
+        if i <= 0:
+            i = 1
+        elif i >= len(angles):
+            i = len(angles) - 1
+        (ax, ay), (bx, by) = self.points[i - 1], self.points[i]
+        # Inside the triangle fan when the point is on the origin's side of the edge
+        edge_x, edge_y = bx - ax, by - ay
+        side_point = edge_x * (point[1] - ay) - edge_y * (point[0] - ax)
+        side_origin = edge_x * (oy - ay) - edge_y * (ox - ax)
+        return side_point * side_origin >= 0
+
+    def contains_many(self, xs, ys):
+        """Vectorized contains() for arrays of world x / y; returns a boolean array."""
+        if np is None:
+            return [self.contains(point) for point in zip(xs, ys)]
+        if self.arrays is None:
+            points = np.asarray(self.points, dtype=np.float64)
+            self.arrays = (np.asarray(self.angles, dtype=np.float64), points[:, 0], points[:, 1])
+        angles, point_xs, point_ys = self.arrays
+
+        ox, oy = self.origin
+        dx = xs - ox
+        dy = ys - oy
+        angle = (np.arctan2(dy, dx) - self.base_angle + math.pi) % math.tau - math.pi
+        inside = (dx * dx + dy * dy <= self.length * self.length) & (np.abs(angle) <= self.half_angle)
+
+        i = np.clip(np.searchsorted(angles, angle), 1, len(angles) - 1)
+        ax, ay = point_xs[i - 1], point_ys[i - 1]
+        edge_x = point_xs[i] - ax
+        edge_y = point_ys[i] - ay
+        side_point = edge_x * (ys - ay) - edge_y * (xs - ax)
+        side_origin = edge_x * (oy - ay) - edge_y * (ox - ax)
+        return inside & (side_point * side_origin >= 0)
+
+    def screen_points(self, offset, scale = 1):
+        """Polygon outline (origin first) in screen space, divided by scale."""
+        ox, oy = offset
+        outline = [self.origin] + self.points
+        return [((x + ox) / scale, (y + oy) / scale) for x, y in outline]
+
+
+def cast_cone(origin, direction, length, half_angle, occluders, arc_step = 2, epsilon = 1e-4, pierce = 0):
+    """Clip a light cone against the rects of a StaticSpatialHash.
+
+    Angular sweep: the rays are the cone arc samples plus a pair just either
+    side of every occluder corner inside the cone. Occluders are sorted by
+    the start of their angular span and kept in an active list while the
+    sweep passes over them, so each ray only clips against the few rects
+    that actually cover its angle.
+
+    A ray goes up to pierce px into the rect it hits (never out the far
+    side), so the occluder's own lit face is inside the polygon and only
+    what lies behind it is in shadow.
+    """
+    ox, oy = origin
+    base_angle = math.atan2(direction[1], direction[0])
+
+    steps = max(2, math.ceil(math.degrees(half_angle * 2) / arc_step))
+    angles = [-half_angle + half_angle * 2 * (i / steps) for i in range(steps + 1)]
+
+    # Only rects near the cone: bounding box of the origin and its arc
+    arc_x = [ox + math.cos(base_angle + a) * length for a in angles]
+    arc_y = [oy + math.sin(base_angle + a) * length for a in angles]
+    left, right = min(arc_x + [ox]), max(arc_x + [ox])
+    top, bottom = min(arc_y + [oy]), max(arc_y + [oy])
+    bounds = pygame.FRect(left, top, right - left, bottom - top).inflate(2, 2)
+
+    spans = []  # [(start_angle, end_angle, rect)]
+    for rect in occluders.query(bounds):
+        if rect.collidepoint(origin):
+            continue  # standing inside a collider; it can't shadow anything sensible
+        corners = [_wrap_angle(math.atan2(cy - oy, cx - ox) - base_angle)
+                   for cx, cy in (rect.topleft, rect.topright, rect.bottomright, rect.bottomleft)]
+        start, end = min(corners), max(corners)
+        if end - start > math.pi or end < -half_angle or start > half_angle:
+            continue  # behind the player (wraps around) or outside the cone
+        spans.append((start, end, rect))
+        for corner in corners:
+            if -half_angle < corner < half_angle:
+                angles.append(max(-half_angle, corner - epsilon))
+                angles.append(min(half_angle, corner + epsilon))
+
+    angles.sort()
+    spans.sort(key = lambda span: span[0])
+
+    points = []
+    active = []
+    next_span = 0
+    for angle in angles:
+        while next_span < len(spans) and spans[next_span][0] <= angle:
+            active.append(spans[next_span])
+            next_span += 1
+        if active:
+            active = [span for span in active if span[1] >= angle]
+
+        ray_x = math.cos(base_angle + angle)
+        ray_y = math.sin(base_angle + angle)
+        end = (ox + ray_x * length, oy + ray_y * length)
+        best = length
+        for _, _, rect in active:
+            clipped = rect.clipline(origin, end)
+            if clipped:
+                # Entry and exit points, in order along the ray
+                (enter_x, enter_y), (exit_x, exit_y) = clipped
+                enter = math.hypot(enter_x - ox, enter_y - oy)
+                best = min(best, enter + pierce, math.hypot(exit_x - ox, exit_y - oy))
+        points.append((ox + ray_x * best, oy + ray_y * best))
+
+    return VisibilityPolygon(origin, base_angle, half_angle, length, angles, points)
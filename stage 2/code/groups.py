@@ -1,14 +1,28 @@
 from settings import * 
 
+def blit_batch(surface, batch):
+    """Submit a sequence of (surface, dest) pairs in one call (fblits on pygame-ce)."""
+    if hasattr(surface, 'fblits'):
+        surface.fblits(batch)
+    else:
+        surface.blits(batch, doreturn=False)
+
 class AllSprites(pygame.sprite.Group):
     def __init__(self):
         super().__init__()
         self.display_surface = pygame.display.get_surface()
         self.offset = pygame.Vector2()
+        self.tile_layers = []  # Baked static TileLayers, drawn below all sprites, the ground included
 
     def draw(self, target_pos):
         self.offset.x = -(target_pos[0] - WINDOW_WIDTH / 2)
         self.offset.y = -(target_pos[1] - WINDOW_HEIGHT / 2)
 
-        for sprite in self:
-            self.display_surface.blit(sprite.image, sprite.rect.topleft + self.offset)
\ No newline at end of file
+        for tile_layer in self.tile_layers:
+            tile_layer.draw(self.display_surface, self.offset)
+
+        # Every sprite is drawn over the baked tiles in insertion order.
+        # Collect (image, dest) pairs and submit them in a single batched blit
+        offset_x, offset_y = self.offset
+        blit_batch(self.display_surface, [(sprite.image, (sprite.rect.x + offset_x, sprite.rect.y + offset_y))
+                                          for sprite in self.spritedict])
\ No newline at end of file
@@ -1,9 +1,13 @@
 from settings import * 
 from sprites import * 
 from groups import AllSprites
+from tilelayer import TileLayer
+from spatial import SolidGrid, EntityGrid
+from pools import ProjectilePool
 from support import * 
 from timer import Timer
 from theme_systems import *
+from effects import ScreenEffects
 from random import randint, sample
 import sys
 import math
@@ -37,12 +41,15 @@ class Game:
             self.game_over_font = pygame.font.Font(None, 64)
             self.title_font = pygame.font.Font(None, 48)
         self.game_over = False
+        self.show_collision_debug = False  # F3 outlines the merged collision rects
 
         # Sprite groups
         self.all_sprites = AllSprites()
-        self.collision_sprites = pygame.sprite.Group()
+        # Pooled full-screen surfaces for freeze / hit flash / game-over passes
+        self.screen_effects = ScreenEffects()
         self.bullet_sprites = pygame.sprite.Group()
         self.enemy_sprites = pygame.sprite.Group()
+        self.enemy_grid = EntityGrid()  # enemies re-bucketed every frame for bullet / player tests
         
         # Store worm spawn data for respawning
         self.worm_spawn_data = []
@@ -162,8 +169,8 @@ class Game:
             
     def create_bullet(self, pos, direction):
         x = pos[0] + direction * 34 if direction == 1 else pos[0] + direction * 34 - self.bullet_surf.get_width()
-        Bullet(self.bullet_surf, (x, pos[1]), direction, (self.all_sprites, self.bullet_sprites))
-        Fire(self.fire_surf, pos, self.all_sprites, self.player)
+        self.bullet_pool.spawn((x, pos[1]), direction)
+        self.fire_pool.spawn(pos, self.player)
         self.audio['shoot'].play()
 
     def load_assets(self):
@@ -213,23 +220,26 @@ class Game:
         self.level_width = tmx_map.width * tmx_map.tilewidth
         self.level_height = tmx_map.height * tmx_map.tileheight
 
-        for x, y, image in tmx_map.get_layer_by_name('Main').tiles():
-            Sprite((x * tmx_map.tilewidth, y * tmx_map.tileheight), image, (self.all_sprites, self.collision_sprites))
+        # Main tiles are solid; collision looks them up by tile coordinates
+        self.solid_grid = SolidGrid(tmx_map, 'Main')
 
-        # Optional non-colliding decoration layer (drawn above Main, below entities)
-        try:
-            for x, y, image in tmx_map.get_layer_by_name('Decoration').tiles():
-                # Only add to all_sprites so these don't block movement
-                Sprite((x * tmx_map.tilewidth, y * tmx_map.tileheight), image, self.all_sprites)
-        except Exception:
-            # If the decoration layer doesn't exist, skip gracefully
-            pass
+        # Bullets and muzzle flashes are recycled; bullets leaving the level are culled
+        level_rect = pygame.FRect(0, 0, self.level_width, self.level_height)
+        self.bullet_pool = ProjectilePool(
+            lambda pos, direction: Bullet(self.bullet_surf, pos, direction, (), self.solid_grid),
+            (self.all_sprites, self.bullet_sprites), level_rect)
+        self.fire_pool = ProjectilePool(
+            lambda pos, player: Fire(self.fire_surf, pos, (), player), (self.all_sprites,))
+
+        # Main + optional non-colliding Decoration layer, baked into chunks (drawn below entities)
+        self.tile_layer = TileLayer(tmx_map, ['Main', 'Decoration'])
+        self.all_sprites.tile_layers.append(self.tile_layer)
 
         for object in tmx_map.get_layer_by_name('Entities'):
             if object.name == 'Player':
                 self.player = Player(pos=(object.x, object.y),
                                    groups=self.all_sprites,
-                                   collision_sprites=self.collision_sprites,
+                                   solid_grid=self.solid_grid,
                                    frames=self.player_frames,
                                    create_bullet=self.create_bullet)
                 self.ground_level = object.y
@@ -254,10 +264,12 @@ class Game:
                 Worm(self.worm_frames, worm_rect.copy(), (self.all_sprites, self.enemy_sprites))
 
     def collision(self):
+        self.enemy_grid.rebuild(self.enemy_sprites)
         # In sequence mode, use bullet collision to kill bees
         if self.bullet_sprites and self.enemy_sprites:
             for bullet in self.bullet_sprites:
-                collision_sprites = pygame.sprite.spritecollide(bullet, self.enemy_sprites, False, pygame.sprite.collide_mask)
+                collision_sprites = [enemy for enemy in self.enemy_grid.query_rect(bullet.rect)
+                                     if collide_rect_mask(bullet, enemy)]
                 if collision_sprites:
                     self.audio['impact'].play()
                     for enemy in collision_sprites:
@@ -306,7 +318,8 @@ class Game:
         
         # Player collision with enemies
         if not self.invulnerable_timer:
-            collision_sprites = pygame.sprite.spritecollide(self.player, self.enemy_sprites, False, pygame.sprite.collide_mask)
+            collision_sprites = [enemy for enemy in self.enemy_grid.query_rect(self.player.rect)
+                                 if collide_rect_mask(self.player, enemy)]
             if collision_sprites:
                 self.player_hit()
         # In sequence mode, bees persist even during invulnerability
@@ -400,10 +413,7 @@ class Game:
         self.display_surface.blit(pct_text, (x + bar_width + 10, y - 2))
 
     def draw_game_over(self):
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.display_surface.blit(overlay, (0, 0))
+        self.screen_effects.dim(self.display_surface, 200)
         
         if self.victory:
             game_over_text = self.game_over_font.render("VICTORY!", True, (255, 215, 0))
@@ -458,6 +468,8 @@ class Game:
                         self.running = False
                     elif event.key == pygame.K_q:
                         self.running = False
+                    elif event.key == pygame.K_F3:
+                        self.show_collision_debug = not self.show_collision_debug
                     elif event.key == pygame.K_e:
                         # Toggle memory flash; drains meter while active
                         if self.memory_flash_active:
@@ -564,6 +576,7 @@ class Game:
                     # Cognitive load system disabled for pure sequence mode
                     
                     self.all_sprites.update(dt)
+                    self.bullet_pool.cull()
                     self.collision()
                     # No wave completion; progression handled by sequence manager
                 
@@ -580,6 +593,12 @@ class Game:
                 # No screen shake in sequence mode - stable camera
                 camera_center = (self.player.rect.centerx, self.player.rect.centery)
                 self.all_sprites.draw(camera_center)
+                if self.show_collision_debug:
+                    self.solid_grid.draw_debug(self.display_surface, self.all_sprites.offset)
+                    pool_text = self.font.render(f"Bullets: {self.bullet_pool.stats()}", True, (255, 0, 255))
+                    self.display_surface.blit(pool_text, (10, WINDOW_HEIGHT - 40))
+                    solid_text = self.font.render(f"Collision: {self.solid_grid.stats()}", True, (255, 0, 255))
+                    self.display_surface.blit(solid_text, (10, WINDOW_HEIGHT - 80))
                 
                 # Draw numbered indicators above bees when showing sequence or when memory flash is active
                 if self.sequence_state == 'SHOW' or self.memory_flash_active:
@@ -663,16 +682,10 @@ class Game:
                 
                 # Add freeze effect overlay
                 if self.freeze_timer:
-                    freeze_overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-                    freeze_overlay.set_alpha(30)
-                    freeze_overlay.fill((150, 200, 255))  # Light blue freeze effect
-                    self.display_surface.blit(freeze_overlay, (0, 0))
+                    self.screen_effects.tint(self.display_surface, (150, 200, 255), 30)  # Light blue freeze effect
                 
-                if self.invulnerable_timer and pygame.time.get_ticks() % 200 < 100:
-                    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-                    overlay.set_alpha(50)
-                    overlay.fill((255, 0, 0))
-                    self.display_surface.blit(overlay, (0, 0))
+                if self.invulnerable_timer:
+                    self.screen_effects.flash(self.display_surface, (255, 0, 0), 50)
             else:
                 self.draw_game_over()
             
@@ -0,0 +1,188 @@
+from settings import *
+import math
+
+def greedy_mesh(cells, width, height):
+    """Merge solid cells into maximal rectangles (greedy meshing, rows then columns).
+
+    Each unclaimed solid cell starts a run that grows along its row, then the
+    run is extended down while the next row has the same span solid and free.
+    Returns [(x, y, w, h)] in tile units.
+    """
+    used = bytearray(len(cells))
+    merged = []
+    for y in range(height):
+        for x in range(width):
+            i = y * width + x
+            if not cells[i] or used[i]:
+                continue
+            w = 1
+            while x + w < width and cells[i + w] and not used[i + w]:
+                w += 1
+            h = 1
+            while y + h < height:
+                row = (y + h) * width + x
+                if not all(cells[row + k] and not used[row + k] for k in range(w)):
+                    break
+                h += 1
+            for row in range(y, y + h):
+                start = row * width + x
+                used[start:start + w] = b'\x01' * w
+            merged.append((x, y, w, h))
+    return merged
+
+
+class SolidGrid:
+    """Collision tiles of a TMX layer compiled into a flat bytearray (1 = solid).
+
+    Collision and floor probes only look up the few cells under a rect, so
+    their cost doesn't grow with the size of the level. Solid cells are also
+    greedy-meshed into a few large rects, which is what collision resolves
+    against (a flat floor is one rect, not one per tile).
+    """
+    def __init__(self, tmx_map, layer_name):
+        self.width = tmx_map.width
+        self.height = tmx_map.height
+        self.tile_width = tmx_map.tilewidth
+        self.tile_height = tmx_map.tileheight
+        self.cells = bytearray(self.width * self.height)  # row-major, index = y * width + x
+        for x, y, _ in tmx_map.get_layer_by_name(layer_name).tiles():
+            self.cells[y * self.width + x] = 1
+
+        self.rects = []  # merged world rects
+        self.cell_rects = [-1] * len(self.cells)  # cell -> index into rects, -1 when open
+        for x, y, w, h in greedy_mesh(self.cells, self.width, self.height):
+            for row in range(y, y + h):
+                start = row * self.width + x
+                self.cell_rects[start:start + w] = [len(self.rects)] * w
+            self.rects.append(pygame.FRect(x * self.tile_width, y * self.tile_height,
+                                           w * self.tile_width, h * self.tile_height))
+
+    def stats(self):
+        """Debug overlay text: solid tiles against the merged rects standing in for them."""
+        return f"{sum(self.cells)} tiles -> {len(self.rects)} rects"
+
+    def is_solid(self, tile_x, tile_y):
+        """Solid test by tile coordinates; everything outside the map is open."""
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return self.cells[tile_y * self.width + tile_x] == 1
+        return False
+
+    def tile_range(self, rect):
+        """Tile index ranges overlapped by rect, clamped to the map (empty ranges when outside)."""
+        x0 = max(0, int(rect.left // self.tile_width))
+        x1 = min(self.width, math.ceil(rect.right / self.tile_width))
+        y0 = max(0, int(rect.top // self.tile_height))
+        y1 = min(self.height, math.ceil(rect.bottom / self.tile_height))
+        return range(x0, x1), range(y0, y1)
+
+    def solid_rects(self, rect):
+        """Merged solid rects overlapping rect, each once, in row-major order of first touch."""
+        cols, rows = self.tile_range(rect)
+        cell_rects, width = self.cell_rects, self.width
+        found = {}  # insertion-ordered set of rect indices
+        for y in rows:
+            for x in cols:
+                index = cell_rects[y * width + x]
+                if index >= 0:
+                    found[index] = None
+        return [self.rects[index] for index in found]
+
+    def collides(self, rect):
+        """True when any solid tile overlaps rect."""
+        cols, rows = self.tile_range(rect)
+        cells, width = self.cells, self.width
+        return any(cells[y * width + x] for y in rows for x in cols)
+
+    def raycast(self, start, end):
+        """Point where the segment start -> end first enters a solid tile, or None.
+
+        Steps tile by tile along the segment (Amanatides & Woo DDA), so a fast
+        projectile can't skip over a one-tile wall between frames.
+        """
+        tw, th = self.tile_width, self.tile_height
+        x, y = start
+        dx, dy = end[0] - x, end[1] - y
+        tx, ty = int(x // tw), int(y // th)
+        if self.is_solid(tx, ty):
+            return start
+        steps = abs(int(end[0] // tw) - tx) + abs(int(end[1] // th) - ty)
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Segment parameter t (0..1) at the next vertical / horizontal tile boundary
+        t_max_x = ((tx + (dx > 0)) * tw - x) / dx if dx else float('inf')
+        t_max_y = ((ty + (dy > 0)) * th - y) / dy if dy else float('inf')
+        t_delta_x = tw / abs(dx) if dx else float('inf')
+        t_delta_y = th / abs(dy) if dy else float('inf')
+        for _ in range(steps):
+            if t_max_x < t_max_y:
+                tx += step_x
+                t = t_max_x
+                t_max_x += t_delta_x
+            else:
+                ty += step_y
+                t = t_max_y
+                t_max_y += t_delta_y
+            if t > 1:
+                break
+            if self.is_solid(tx, ty):
+                return (x + dx * t, y + dy * t)
+        return None
+
+    def draw_debug(self, surface, offset):
+        """Outline the merged collision rects (world rects shifted by the camera offset)."""
+        view = pygame.FRect(-offset.x, -offset.y, surface.get_width(), surface.get_height())
+        for rect in self.rects:
+            if view.colliderect(rect):
+                pygame.draw.rect(surface, (255, 0, 255), rect.move(offset.x, offset.y), 2)
+
+
+class EntityGrid:
+    """Uniform grid of moving sprites for broad-phase and proximity queries.
+
+    Rebuilt from the sprites' rects once per frame. A sprite is bucketed in
+    every cell its rect overlaps, so queries only look at sprites nearby and
+    their cost follows local density instead of the total sprite count.
+    """
+    def __init__(self, cell_size = 128):
+        self.cell_size = cell_size
+        self.cells = {}  # {(cell_x, cell_y): [sprite]}
+        self.count = 0
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (int(rect.left // size), int((rect.right - 1e-6) // size),
+                int(rect.top // size), int((rect.bottom - 1e-6) // size))
+
+    def rebuild(self, sprites):
+        """Re-bucket every sprite at its current rect."""
+        cells = self.cells = {}
+        size = self.cell_size
+        count = 0
+        for sprite in sprites:
+            rect = sprite.rect
+            x0, x1 = int(rect.left // size), int((rect.right - 1e-6) // size)
+            y0, y1 = int(rect.top // size), int((rect.bottom - 1e-6) // size)
+            for cy in range(y0, y1 + 1):
+                for cx in range(x0, x1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket is None:
+                        cells[(cx, cy)] = [sprite]
+                    else:
+                        bucket.append(sprite)
+            count += 1
+        self.count = count
+
+    def candidates(self, rect):
+        """Sprites bucketed in the cells under rect, each once (no overlap test)."""
+        x0, x1, y0, y1 = self.cell_range(rect)
+        cells = self.cells
+        found = {}  # insertion-ordered set
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                for sprite in cells.get((cx, cy), ()):
+                    found[sprite] = None
+        return found
+
+    def query_rect(self, rect):
+        """Sprites whose rect overlaps rect."""
+        return [sprite for sprite in self.candidates(rect) if rect.colliderect(sprite.rect)]
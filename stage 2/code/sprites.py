@@ -1,5 +1,6 @@
 from settings import * 
 from timer import Timer
+from support import frame_mask, flip_frame
 from math import sin
 import math
 from random import randint, uniform
@@ -11,29 +12,55 @@ class Sprite(pygame.sprite.Sprite):
         self.image = surf 
         self.rect = self.image.get_frect(topleft = pos)
 
-class Bullet(Sprite):
-    def __init__(self, surf, pos, direction, groups):
+class Projectile(Sprite):
+    """Short-lived sprite that a ProjectilePool can recycle (see reset())."""
+    pool = None
+
+    def kill(self):
+        super().kill()
+        if self.pool:
+            self.pool.release(self)
+
+class Bullet(Projectile):
+    def __init__(self, surf, pos, direction, groups, solid_grid = None):
         super().__init__(pos, surf, groups)
-        self.image = pygame.transform.flip(self.image, direction == -1, False)
-        self.direction = direction
+        self.surf = surf
         self.speed = 850
+        self.solid_grid = solid_grid  # bullets stop at the first solid tile
+        self.reset(pos, direction)
+
+    def reset(self, pos, direction):
+        self.image = flip_frame(self.surf) if direction == -1 else self.surf
+        self.mask = frame_mask(self.image)
+        self.rect.topleft = pos
+        self.direction = direction
     
     def update(self, dt):
+        start = self.rect.center
         self.rect.x += self.direction * self.speed * dt
+        # Trace the whole step so the bullet can't skip over thin walls at low fps
+        if self.solid_grid and self.solid_grid.raycast(start, self.rect.center):
+            self.kill()
 
 # Enemy bullet classes removed per design request.
 
-class Fire(Sprite):
+class Fire(Projectile):
     def __init__(self, surf, pos, groups, player):
         super().__init__(pos, surf, groups)
+        self.surf = surf
+        self.timer = Timer(100, func = self.kill)
+        self.y_offset = pygame.Vector2(0,8)
+        self.reset(pos, player)
+
+    def reset(self, pos, player):
         self.player = player 
         self.flip = player.flip
-        self.timer = Timer(100, autostart = True, func = self.kill)
-        self.y_offset = pygame.Vector2(0,8)
+        self.timer.activate()
         if self.player.flip:
+            self.image = flip_frame(self.surf)
             self.rect.midright = self.player.rect.midleft + self.y_offset
-            self.image = pygame.transform.flip(self.image, True, False)
         else:
+            self.image = self.surf
             self.rect.midleft = self.player.rect.midright + self.y_offset
 
     def update(self, _):
@@ -49,10 +76,12 @@ class AnimatedSprite(Sprite):
     def __init__(self, frames, pos, groups):
         self.frames, self.frame_index, self.animation_speed = frames, 0, 10
         super().__init__(pos, self.frames[self.frame_index], groups)
+        self.mask = frame_mask(self.image)
 
     def animate(self, dt):
         self.frame_index += self.animation_speed * dt
         self.image = self.frames[int(self.frame_index) % len(self.frames)]
+        self.mask = frame_mask(self.image)
 
 class Enemy(AnimatedSprite):
     def __init__(self, frames, pos, groups):
@@ -85,6 +114,7 @@ class Enemy(AnimatedSprite):
         """Override to apply alpha after animation and handle fade-out"""
         self.frame_index += self.animation_speed * dt
         base_image = self.frames[int(self.frame_index) % len(self.frames)]
+        self.mask = frame_mask(base_image)
         
         # Apply alpha transparency
         img = base_image.copy()
@@ -157,7 +187,7 @@ class Worm(Enemy):
     def constraint(self):
         if not self.main_rect.contains(self.rect):
             self.direction *= -1
-            self.frames = [pygame.transform.flip(surf, True, False) for surf in self.frames]
+            self.frames = [flip_frame(surf) for surf in self.frames]
 
 class SequenceBee(Enemy):
     """Moving bee used for sequence memory gameplay"""
@@ -223,6 +253,7 @@ class SequenceBee(Enemy):
         # Animate frames and apply death-like fade loop when highlighted
         self.frame_index += self.animation_speed * dt
         base_image = self.frames[int(self.frame_index) % len(self.frames)]
+        self.mask = frame_mask(base_image)
         img = base_image.copy()
 
         if self.highlight:
@@ -248,12 +279,12 @@ class SequenceBee(Enemy):
         return
 
 class Player(AnimatedSprite):
-    def __init__(self, pos, groups, collision_sprites, frames, create_bullet):
+    def __init__(self, pos, groups, solid_grid, frames, create_bullet):
         super().__init__(frames, pos, groups)
         self.flip = False
         self.create_bullet = create_bullet
         self.direction = pygame.Vector2()
-        self.collision_sprites = collision_sprites
+        self.solid_grid = solid_grid  # SolidGrid of the Main layer
         self.speed = 300
         self.gravity = 50
         self.on_floor = False
@@ -298,20 +329,21 @@ class Player(AnimatedSprite):
         self.collision('vertical')
 
     def collision(self, direction):
-        for sprite in self.collision_sprites:
-            if sprite.rect.colliderect(self.rect):
+        # Only the solid tiles under the player are looked up
+        for rect in self.solid_grid.solid_rects(self.rect):
+            if rect.colliderect(self.rect):
                 if direction == 'horizontal':
-                    if self.direction.x > 0: self.rect.right = sprite.rect.left
-                    if self.direction.x < 0: self.rect.left = sprite.rect.right
+                    if self.direction.x > 0: self.rect.right = rect.left
+                    if self.direction.x < 0: self.rect.left = rect.right
                 if direction == 'vertical':
-                    if self.direction.y > 0: self.rect.bottom = sprite.rect.top
-                    if self.direction.y < 0: self.rect.top = sprite.rect.bottom
+                    if self.direction.y > 0: self.rect.bottom = rect.top
+                    if self.direction.y < 0: self.rect.top = rect.bottom
                     self.direction.y = 0
 
     def check_floor(self):
         bottom_rect = pygame.FRect((0,0), (self.rect.width, 2)).move_to(midtop = self.rect.midbottom)
         was_on_floor = self.on_floor
-        self.on_floor = True if bottom_rect.collidelist([sprite.rect for sprite in self.collision_sprites]) >= 0 else False
+        self.on_floor = self.solid_grid.collides(bottom_rect)
         if self.on_floor and not was_on_floor:
             self.jump_count = 0
 
@@ -322,8 +354,10 @@ class Player(AnimatedSprite):
         else:
             self.frame_index = 0
         self.frame_index = 1 if not self.on_floor else self.frame_index
-        self.image = self.frames[int(self.frame_index) % len(self.frames)]
-        self.image = pygame.transform.flip(self.image, self.flip, False)
+        frame = self.frames[int(self.frame_index) % len(self.frames)]
+        # Flipped frames and masks are cached, not rebuilt every frame
+        self.image = flip_frame(frame) if self.flip else frame
+        self.mask = frame_mask(self.image)
 
     def update(self, dt):
         self.shoot_timer.update()
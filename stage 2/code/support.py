@@ -49,4 +49,30 @@ def audio_importer(*path):
         for file_name in file_names:
             full_path = join(folder_path, file_name)
             audio_dict[file_name.split('.')[0]] = pygame.mixer.Sound(full_path)
-    return audio_dict
\ No newline at end of file
+    return audio_dict
+
+
+# Collision masks and horizontal flips, computed once per frame surface and shared
+# by every sprite showing that frame (frames are long-lived, so the caches stay small)
+frame_masks = {}
+flipped_frames = {}
+
+def frame_mask(surface):
+    """Collision mask of an animation frame, built on first use."""
+    mask = frame_masks.get(surface)
+    if mask is None:
+        mask = frame_masks[surface] = pygame.mask.from_surface(surface)
+    return mask
+
+def flip_frame(surface):
+    """Horizontally flipped copy of a frame; flipping it back returns the original."""
+    flipped = flipped_frames.get(surface)
+    if flipped is None:
+        flipped = pygame.transform.flip(surface, True, False)
+        flipped_frames[surface] = flipped
+        flipped_frames[flipped] = surface
+    return flipped
+
+def collide_rect_mask(left, right):
+    """pygame.sprite.collide_mask behind a cheap rect test; uses the sprites' cached .mask."""
+    return left.rect.colliderect(right.rect) and pygame.sprite.collide_mask(left, right)
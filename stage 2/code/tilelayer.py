@@ -0,0 +1,62 @@
+from settings import *
+
+class TileLayer:
+    """Static TMX tile layers pre-composited into fixed-size chunk surfaces.
+
+    Tiles are baked once at load time, so drawing only blits the few chunks
+    that intersect the camera instead of one sprite per tile.
+    """
+    def __init__(self, tmx_map, layer_names, chunk_tiles = 8):
+        self.tile_width = tmx_map.tilewidth
+        self.tile_height = tmx_map.tileheight
+        self.chunk_width = chunk_tiles * self.tile_width
+        self.chunk_height = chunk_tiles * self.tile_height
+        self.chunks = {}  # {(chunk_x, chunk_y): Surface}
+        self.tile_count = 0
+        self.drawn_count = 0
+
+        for name in layer_names:
+            try:
+                layer = tmx_map.get_layer_by_name(name)
+            except ValueError:
+                # Optional layers (e.g. decoration) may not exist in every map
+                continue
+            for x, y, image in layer.tiles():
+                self.bake_tile(x * self.tile_width, y * self.tile_height, image)
+                self.tile_count += 1
+
+        for key, chunk in self.chunks.items():
+            self.chunks[key] = chunk.convert_alpha()
+
+    def bake_tile(self, world_x, world_y, image):
+        # Oversized tile images may spill into neighbouring chunks
+        first_cx = int(world_x // self.chunk_width)
+        last_cx = int((world_x + image.get_width() - 1) // self.chunk_width)
+        first_cy = int(world_y // self.chunk_height)
+        last_cy = int((world_y + image.get_height() - 1) // self.chunk_height)
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    chunk = pygame.Surface((self.chunk_width, self.chunk_height), pygame.SRCALPHA)
+                    self.chunks[(cx, cy)] = chunk
+                chunk.blit(image, (world_x - cx * self.chunk_width, world_y - cy * self.chunk_height))
+
+    def draw(self, surface, offset):
+        """Blit the chunks visible through a camera at the given draw offset."""
+        view_left = -offset.x
+        view_top = -offset.y
+        first_cx = int(view_left // self.chunk_width)
+        last_cx = int((view_left + surface.get_width()) // self.chunk_width)
+        first_cy = int(view_top // self.chunk_height)
+        last_cy = int((view_top + surface.get_height()) // self.chunk_height)
+
+        drawn = 0
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk is None:
+                    continue
+                surface.blit(chunk, (cx * self.chunk_width + offset.x, cy * self.chunk_height + offset.y))
+                drawn += 1
+        self.drawn_count = drawn